@@ -1,15 +1,124 @@
+import logging
+import os
+
 import dash
 import dash_bootstrap_components as dbc
+import diskcache
+import plotly.io as pio
 from dash import html, dcc, Input, Output
+from flask import jsonify, request
+
+from background import ForkServerManager
+from cache import model_cache
+from config import (
+    ASSET_MAX_AGE, BACKGROUND_CACHE_PATH, COMPRESS, COMPRESS_ALGORITHMS, COMPRESS_BR_LEVEL, COMPRESS_LEVEL,
+    COMPRESS_MIN_SIZE, FONT_CSS_URL, FONT_FILE, JSON_ENGINE,
+)
+import warmup
+
+log = logging.getLogger(__name__)
+
+# Dash serializa las respuestas con plotly.io.json
+pio.json.config.default_engine = JSON_ENGINE
+
+# Callbacks en segundo plano (página de clima) sin broker externo
+background_callback_manager = ForkServerManager(diskcache.Cache(BACKGROUND_CACHE_PATH))
 
 app = dash.Dash(
     __name__,
     use_pages=True,
     external_stylesheets=[dbc.themes.LUX],
-    suppress_callback_exceptions=True
+    suppress_callback_exceptions=True,
+    background_callback_manager=background_callback_manager
 )
 server = app.server
 
+# Tipos que vale la pena comprimir; las imágenes y las fuentes woff2 ya vienen comprimidas
+COMPRESS_MIMETYPES = [
+    'application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript',
+    'image/svg+xml',
+]
+
+
+def enable_compression(server):
+    """Compresión negociada (brotli/gzip) de callbacks, páginas y assets.
+
+    Las respuestas de ``/_dash-update-component`` son JSON muy repetitivo y
+    se reducen varias veces. Si flask-compress no está instalado se avisa y
+    se sirve sin comprimir (salvo que lo haga el proxy de adelante).
+    """
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        log.warning("MODELOS_COMPRESS está activo pero flask-compress no está instalado: "
+                    "las respuestas salen sin comprimir")
+        return False
+    server.config.update(
+        COMPRESS_ALGORITHM=COMPRESS_ALGORITHMS,
+        COMPRESS_LEVEL=COMPRESS_LEVEL,
+        COMPRESS_BR_LEVEL=COMPRESS_BR_LEVEL,
+        COMPRESS_MIN_SIZE=COMPRESS_MIN_SIZE,
+        COMPRESS_MIMETYPES=COMPRESS_MIMETYPES,
+    )
+    Compress(server)
+    return True
+
+
+if COMPRESS:
+    enable_compression(server)
+
+ASSETS_URL = app.get_asset_url('')
+FONTS_URL = app.get_asset_url('fonts/')
+
+# Outfit (fuente variable, subconjunto latino); se descarga con tools/fetch_fonts.py
+FONT_UNICODE_RANGE = ('U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, '
+                      'U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD')
+
+
+def font_head():
+    """Etiquetas de la fuente para el ``<head>``.
+
+    Con el woff2 en assets/fonts se precarga (se pide en paralelo con el CSS,
+    no después de leerlo) y se declara con @font-face. Mientras no se haya
+    descargado se usa la hoja de Google Fonts (display=swap), cargada sin
+    bloquear el primer render: se precarga y pasa a stylesheet al llegar.
+    """
+    if not os.path.exists(os.path.join(app.config.assets_folder, 'fonts', FONT_FILE)):
+        return ('<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+                f'<link rel="preload" href="{FONT_CSS_URL}" as="style" '
+                'onload="this.onload=null;this.rel=\'stylesheet\'">'
+                f'<noscript><link rel="stylesheet" href="{FONT_CSS_URL}"></noscript>')
+    url = FONTS_URL + FONT_FILE
+    return (f'<link rel="preload" href="{url}" as="font" type="font/woff2" crossorigin>'
+            "<style>@font-face {font-family: 'Outfit'; font-style: normal; font-weight: 100 900; "
+            f"font-display: swap; src: local('Outfit'), url('{url}') format('woff2'); "
+            f"unicode-range: {FONT_UNICODE_RANGE};}}</style>")
+
+
+app.index_string = app.index_string.replace('{%css%}', font_head() + '{%css%}')
+
+
+@server.after_request
+def cache_static_assets(response):
+    # Dash agrega ?m=<mtime> a los assets que enlaza: cambiar el archivo cambia la URL
+    fingerprinted = request.args.get('m') or request.path.startswith(FONTS_URL)
+    if response.status_code == 200 and fingerprinted and request.path.startswith(ASSETS_URL):
+        response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
+
+
+@server.route("/_model-cache/stats")
+def model_cache_stats():
+    return jsonify(model_cache.stats())
+
+
+@server.route("/_ready")
+def readiness():
+    # Para el balanceador: 503 hasta que wsgi.py termina el calentamiento
+    status = warmup.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
 toggle_btn = html.Button("☰", id="toggle-btn", className="toggle-btn")
 
 sidebar = html.Div(
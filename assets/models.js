@@ -0,0 +1,365 @@
+// Versión en el navegador de los modelos con solución cerrada (páginas 03–06 y 10).
+// Cada función replica el callback de servidor de su página (update_*_graph,
+// update_*_marker, zoom_* / update_si), que sigue disponible con
+// MODELOS_CLIENTSIDE=0. El estilo de la
+// figura viene del servidor en un dcc.Store (base_figure), así que aquí solo se
+// calculan las curvas.
+
+(function () {
+    function missing(values) {
+        return values.some(function (v) { return v === null || v === undefined; });
+    }
+
+    function linspaceRange(start, stop, n) {
+        var t = new Array(n);
+        for (var i = 0; i < n; i++) {
+            t[i] = start + (stop - start) * i / (n - 1);
+        }
+        return t;
+    }
+
+    function linspace(stop, n) {
+        return linspaceRange(0, stop, n);
+    }
+
+    // Puntos por traza al volver a evaluar la ventana visible tras un zoom
+    // (mismo valor por omisión que ZOOM_POINTS en config.py)
+    var ZOOM_POINTS = 1000;
+
+    function fixed(value) {
+        return value.toFixed(2);
+    }
+
+    function figure(base, traces, tMax, extraLayout) {
+        var layout = Object.assign({}, base.layout, extraLayout || {});
+        if (tMax !== undefined) {
+            layout.xaxis = Object.assign({}, base.layout.xaxis, {range: [0, tMax]});
+            // El zoom del usuario se conserva mientras no cambie tₘₐₓ
+            layout.uirevision = tMax;
+        }
+        return {data: traces, layout: layout};
+    }
+
+    // Ventana visible tras un relayoutData (ver figures.zoom_window)
+    function zoomWindow(relayout, tMax) {
+        if (!relayout) {
+            return null;
+        }
+        if (relayout['xaxis.autorange']) {
+            return [0, tMax];
+        }
+        var range;
+        if ('xaxis.range[0]' in relayout) {
+            range = [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']];
+        } else if (relayout['xaxis.range']) {
+            range = relayout['xaxis.range'];
+        } else {
+            return null;
+        }
+        var lo = Math.max(range[0], 0), hi = Math.min(range[1], tMax);
+        return hi > lo ? [lo, hi] : null;
+    }
+
+    // Vuelve a evaluar las trazas {índice: P(t)} solo en la ventana visible
+    function rezoom(fig, relayout, tMax, curves) {
+        var range = zoomWindow(relayout, tMax);
+        if (!range || !fig || !fig.data) {
+            return noUpdate();
+        }
+        var t = linspaceRange(range[0], range[1], ZOOM_POINTS);
+        var data = fig.data.slice();
+        for (var index in curves) {
+            var y = t.map(curves[index]);
+            if (!y.every(isFinite)) {
+                return noUpdate();
+            }
+            data[index] = Object.assign({}, data[index], {x: t, y: y});
+        }
+        return Object.assign({}, fig, {data: data});
+    }
+
+    function curve(t, P, color, name) {
+        return {
+            type: 'scatter', x: t, y: P, mode: 'lines',
+            line: {color: color, width: 2}, name: name
+        };
+    }
+
+    function marker(tEval, pEval, color) {
+        return {
+            type: 'scatter', x: [tEval], y: [pEval],
+            mode: 'markers+text',
+            marker: {color: color, size: 10},
+            text: ['P(' + tEval + ') = ' + fixed(pEval)],
+            textposition: 'top center',
+            name: 'Evaluación'
+        };
+    }
+
+    // Equivalente a fig.add_hline(y=k, ..., annotation_position="bottom right")
+    function capacityLine(k) {
+        return {
+            shapes: [{
+                type: 'line', xref: 'x domain', x0: 0, x1: 1, yref: 'y', y0: k, y1: k,
+                line: {dash: 'dot', color: 'gray'}
+            }],
+            annotations: [{
+                text: 'K (capacidad)', showarrow: false,
+                xref: 'x domain', x: 1, xanchor: 'right',
+                yref: 'y', y: k, yanchor: 'top'
+            }]
+        };
+    }
+
+    // Como figures.evaluation_patch: solo cambia el marcador, las curvas de la
+    // figura ya dibujada se reutilizan sin volver a calcularlas
+    function moveMarker(fig, index, tEval, pEval) {
+        if (!fig || !fig.data || !fig.data[index]) {
+            return noUpdate();
+        }
+        var data = fig.data.slice();
+        data[index] = Object.assign({}, data[index], {
+            x: [tEval], y: [pEval], text: ['P(' + tEval + ') = ' + fixed(pEval)]
+        });
+        return Object.assign({}, fig, {data: data});
+    }
+
+    function result(tEval, pEval) {
+        return ' Población en t = ' + tEval + ': P(t) = ' + fixed(pEval);
+    }
+
+    var noUpdate = function () { return window.dash_clientside.no_update; };
+
+    // Soluciones cerradas, compartidas por el dibujo inicial y el zoom
+    function exponentialP(p0, r) {
+        return function (t) { return p0 * Math.exp(r * t); };
+    }
+
+    function logisticP(p0, r, k) {
+        return function (t) { return k * p0 / (p0 + (k - p0) * Math.exp(-r * t)); };
+    }
+
+    function gompertzP(p0, k, r) {
+        var lnRatio = Math.log(k / p0);
+        return function (t) { return k * Math.exp(-lnRatio * Math.exp(-r * t)); };
+    }
+
+    function richardsP(p0, k, r, nu) {
+        var ratio = Math.pow(k / p0, nu);
+        return function (t) {
+            return k / Math.pow(1 + (ratio - 1) * Math.exp(-r * nu * t), 1 / nu);
+        };
+    }
+
+    function siI(s0, i0, beta) {
+        var N = s0 + i0;
+        return function (t) { return (N * i0) / (i0 + (N - i0) * Math.exp(-beta * N * t)); };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        models: {
+            exponential: function (p0, r, tMax, tEval, base) {
+                if (missing([p0, r, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                tEval = Math.min(tEval, tMax);
+                var P = exponentialP(p0, r);
+                var t = linspace(tMax, 200);
+                var pEval = P(tEval);
+                return [
+                    figure(base, [
+                        curve(t, t.map(P), 'blue', 'Ecuación Exponencial'),
+                        marker(tEval, pEval, 'red')
+                    ], tMax),
+                    result(tEval, pEval)
+                ];
+            },
+
+            logistic: function (p0, r, k, tMax, tEval, base) {
+                if (missing([p0, r, k, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                if (p0 >= k) {
+                    p0 = k / 2;
+                }
+                tEval = Math.min(tEval, tMax);
+                var P = logisticP(p0, r, k);
+                var t = linspace(tMax, 400);
+                var pEval = P(tEval);
+                return [
+                    figure(base, [
+                        curve(t, t.map(P), 'blue', 'Ecuación Logística'),
+                        {
+                            type: 'scatter', x: [0, tMax], y: [k, k], mode: 'lines',
+                            line: {color: 'red', width: 2, dash: 'dash'},
+                            name: 'Capacidad de carga (K)'
+                        },
+                        marker(tEval, pEval, 'green')
+                    ], tMax),
+                    result(tEval, pEval)
+                ];
+            },
+
+            gompertz: function (p0, k, r, tMax, tEval, base) {
+                if (missing([p0, k, r, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                if (p0 <= 0 || k <= 0 || p0 > k) {
+                    return [noUpdate(), '⚠️ Asegúrate de que 0 < P₀ ≤ K'];
+                }
+                tEval = Math.min(tEval, tMax);
+                var P = gompertzP(p0, k, r);
+                var t = linspace(tMax, 300);
+                var pEval = P(tEval);
+                return [
+                    figure(base, [
+                        curve(t, t.map(P), 'green', 'Modelo de Gompertz'),
+                        marker(tEval, pEval, 'red')
+                    ], tMax, capacityLine(k)),
+                    result(tEval, pEval)
+                ];
+            },
+
+            richards: function (p0, k, r, nu, tMax, tEval, base) {
+                if (missing([p0, k, r, nu, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                if (p0 <= 0 || k <= 0 || p0 >= k) {
+                    return [noUpdate(), '⚠️ Asegúrate de que 0 < P₀ < K'];
+                }
+                if (nu <= 0) {
+                    return [noUpdate(), '⚠️ ν debe ser > 0'];
+                }
+                tEval = Math.min(tEval, tMax);
+                var P = richardsP(p0, k, r, nu);
+                var t = linspace(tMax, 400);
+                var y = t.map(P);
+                var pEval = P(tEval);
+                if (!y.every(isFinite) || !isFinite(pEval)) {
+                    return [noUpdate(), '⚠️ Error numérico: ajusta los parámetros (ν muy pequeño o r muy grande)'];
+                }
+                return [
+                    figure(base, [
+                        curve(t, y, 'purple', 'Modelo de Richards'),
+                        marker(tEval, pEval, 'red')
+                    ], tMax, capacityLine(k)),
+                    result(tEval, pEval)
+                ];
+            },
+
+            si: function (s0, i0, beta, tMax, base) {
+                if (missing([s0, i0, beta, tMax])) {
+                    return [noUpdate(), ''];
+                }
+                var N = s0 + i0;
+                var t = linspace(tMax, 300);
+                // Solución analítica
+                var I = t.map(siI(s0, i0, beta));
+                var S = I.map(function (v) { return N - v; });
+                return [
+                    figure(base, [
+                        {type: 'scatter', x: t, y: S, mode: 'lines', name: 'Susceptibles'},
+                        {type: 'scatter', x: t, y: I, mode: 'lines', name: 'Infectados'}
+                    ], undefined, {uirevision: tMax}),
+                    ' Infectados finales: I(' + tMax + ') = ' + fixed(I[I.length - 1])
+                ];
+            },
+
+            // "Tiempo a Evaluar": mismas validaciones que arriba; solo se mueve
+            // el marcador de la figura actual
+            exponentialMarker: function (tEval, p0, r, tMax, fig) {
+                if (missing([p0, r, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                tEval = Math.min(tEval, tMax);
+                var pEval = exponentialP(p0, r)(tEval);
+                return [moveMarker(fig, 1, tEval, pEval), result(tEval, pEval)];
+            },
+
+            logisticMarker: function (tEval, p0, r, k, tMax, fig) {
+                if (missing([p0, r, k, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                if (p0 >= k) {
+                    p0 = k / 2;
+                }
+                tEval = Math.min(tEval, tMax);
+                var pEval = logisticP(p0, r, k)(tEval);
+                return [moveMarker(fig, 2, tEval, pEval), result(tEval, pEval)];
+            },
+
+            gompertzMarker: function (tEval, p0, k, r, tMax, fig) {
+                if (missing([p0, k, r, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                if (p0 <= 0 || k <= 0 || p0 > k) {
+                    return [noUpdate(), '⚠️ Asegúrate de que 0 < P₀ ≤ K'];
+                }
+                tEval = Math.min(tEval, tMax);
+                var pEval = gompertzP(p0, k, r)(tEval);
+                return [moveMarker(fig, 1, tEval, pEval), result(tEval, pEval)];
+            },
+
+            richardsMarker: function (tEval, p0, k, r, nu, tMax, fig) {
+                if (missing([p0, k, r, nu, tMax, tEval])) {
+                    return [noUpdate(), ''];
+                }
+                if (p0 <= 0 || k <= 0 || p0 >= k) {
+                    return [noUpdate(), '⚠️ Asegúrate de que 0 < P₀ < K'];
+                }
+                if (nu <= 0) {
+                    return [noUpdate(), '⚠️ ν debe ser > 0'];
+                }
+                tEval = Math.min(tEval, tMax);
+                var pEval = richardsP(p0, k, r, nu)(tEval);
+                if (!isFinite(pEval)) {
+                    return [noUpdate(), '⚠️ Error numérico: ajusta los parámetros (ν muy pequeño o r muy grande)'];
+                }
+                return [moveMarker(fig, 1, tEval, pEval), result(tEval, pEval)];
+            },
+
+            // Zoom: mismas validaciones que arriba; solo cambian las curvas
+            exponentialZoom: function (relayout, p0, r, tMax, fig) {
+                if (missing([p0, r, tMax])) {
+                    return noUpdate();
+                }
+                return rezoom(fig, relayout, tMax, {0: exponentialP(p0, r)});
+            },
+
+            logisticZoom: function (relayout, p0, r, k, tMax, fig) {
+                if (missing([p0, r, k, tMax])) {
+                    return noUpdate();
+                }
+                if (p0 >= k) {
+                    p0 = k / 2;
+                }
+                return rezoom(fig, relayout, tMax, {0: logisticP(p0, r, k)});
+            },
+
+            gompertzZoom: function (relayout, p0, k, r, tMax, fig) {
+                if (missing([p0, k, r, tMax]) || p0 <= 0 || k <= 0 || p0 > k) {
+                    return noUpdate();
+                }
+                return rezoom(fig, relayout, tMax, {0: gompertzP(p0, k, r)});
+            },
+
+            richardsZoom: function (relayout, p0, k, r, nu, tMax, fig) {
+                if (missing([p0, k, r, nu, tMax]) || p0 <= 0 || k <= 0 || p0 >= k || nu <= 0) {
+                    return noUpdate();
+                }
+                return rezoom(fig, relayout, tMax, {0: richardsP(p0, k, r, nu)});
+            },
+
+            siZoom: function (relayout, s0, i0, beta, tMax, fig) {
+                if (missing([s0, i0, beta, tMax])) {
+                    return noUpdate();
+                }
+                var N = s0 + i0, I = siI(s0, i0, beta);
+                return rezoom(fig, relayout, tMax, {
+                    0: function (t) { return N - I(t); },
+                    1: I
+                });
+            }
+        }
+    });
+})();
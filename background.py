@@ -0,0 +1,52 @@
+"""Background callbacks (página de clima) sin broker externo.
+
+``DiskcacheManager`` lanza cada job con un fork del worker. Con gunicorn
+gthread el worker tiene varios hilos: si otro estaba dentro de SQLite (las
+cachés de weather, o el mismo diskcache respondiendo la consulta de otro
+usuario) en el instante del fork, el hijo hereda tomados los mutex globales
+de SQLite y se cuelga al escribir su resultado. ``ForkServerManager`` lanza
+los jobs desde un forkserver: un proceso de un solo hilo que importa la app
+una vez y hace fork por cada job, así que los jobs siguen naciendo con
+weather, pandas y plotly ya cargados.
+"""
+import functools
+
+from dash import DiskcacheManager
+
+# Jobs de Dash por clave; el forkserver llena el suyo al importar la app
+_jobs = {}
+
+
+def _run_job(key, *args):
+    return _jobs[key](*args)
+
+
+class ForkServerManager(DiskcacheManager):
+    def __init__(self, cache, preload=('app',)):
+        # Dash ya exige multiprocess para DiskcacheManager
+        from multiprocess import get_context
+
+        self._context = get_context('forkserver')
+        self._context.set_forkserver_preload(list(preload))
+        super().__init__(cache)
+
+    def make_job_fn(self, fn, progress, key=None):
+        _jobs[key] = super().make_job_fn(fn, progress, key)
+        # Al forkserver solo viaja la clave: el job de Dash no se puede serializar
+        return functools.partial(_run_job, key)
+
+    def terminate_job(self, job):
+        import psutil
+
+        # El forkserver recoge enseguida los jobs que terminan: el proceso
+        # puede desaparecer mientras Dash lo busca para matarlo, y get_result
+        # perdería un resultado que ya leyó
+        try:
+            super().terminate_job(job)
+        except psutil.NoSuchProcess:
+            pass
+
+    def call_job_fn(self, key, job_fn, args, context):
+        process = self._context.Process(target=job_fn, args=(key, self._make_progress_key(key), args, context))
+        process.start()
+        return process.pid
@@ -0,0 +1,200 @@
+"""Benchmark de carga de la página de clima, sin salir a internet.
+
+Levanta los servidores falsos de ``bench.fake_apis``, apunta la app a ellos
+(con cachés en un directorio temporal) y dispara los callbacks de la página
+desde varios usuarios concurrentes con el cliente de pruebas de Flask, como
+el navegador: POST a ``/_dash-update-component`` al callback que responde
+desde caché y después al background callback (que solo consulta los
+servicios si faltó algo), cuyo resultado se consulta cada ``--poll``
+segundos hasta que el proceso del job termina. La latencia de una búsqueda
+servida desde caché termina con la primera respuesta.
+Reporta throughput, latencias p50/p95/p99, cuántas búsquedas salieron de la
+caché, llamadas que llegaron a los servicios y la tasa de aciertos de las
+cachés del proceso del servidor.
+
+    python -m bench.clima --users 20 --requests 500 --cities 40 --latency 0.2
+    python -m bench.clima --mode compare --batch 25 --requests 50
+    python -m bench.clima --no-cache        # línea base sin cachés
+
+Las geocodificaciones que no están en caché respetan el límite de Nominatim
+(una por segundo); ``MODELOS_NOMINATIM_MIN_INTERVAL=0`` lo quita para medir
+solo la app.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fake_apis import add_arguments, from_arguments
+
+
+def _configure(base, cache_dir, no_cache):
+    os.environ.update({
+        "MODELOS_NOMINATIM_URL": f"{base}/search",
+        "MODELOS_OPEN_METEO_URL": f"{base}/v1/forecast",
+        "MODELOS_GEOCODE_CACHE_PATH": os.path.join(cache_dir, "geocode.sqlite"),
+        "MODELOS_FORECAST_CACHE_PATH": os.path.join(cache_dir, "forecast.sqlite"),
+        "MODELOS_BACKGROUND_CACHE_PATH": os.path.join(cache_dir, "background"),
+    })
+    if no_cache:
+        os.environ.update({
+            "MODELOS_GEOCODE_TTL": "0",
+            "MODELOS_GEOCODE_NEGATIVE_TTL": "0",
+            "MODELOS_FORECAST_MAX_STALE": "0",
+        })
+
+
+def _dependencies(output):
+    """``"..a.children...b.figure.."`` → [{"id": "a", "property": "children"}, ...]."""
+    ids = output[2:-2].split("...") if output.startswith("..") else [output]
+    return [dict(zip(("id", "property"), item.rsplit(".", 1))) for item in ids]
+
+
+class ClimaClient:
+    """Un usuario: dispara los callbacks de la página como lo haría el navegador."""
+
+    def __init__(self, app, poll, timeout):
+        self.poll = poll
+        self.timeout = timeout
+        self.client = app.server.test_client()
+        self.url = f"{app.config.routes_pathname_prefix}_dash-update-component"
+        # Callbacks de la página por el id de su Input
+        self.callbacks = {spec["inputs"][0]["id"]: (output, spec) for output, spec in app.callback_map.items()
+                          if spec["inputs"]}
+
+    def _body(self, input_id, value, state):
+        output, spec = self.callbacks[input_id]
+        inputs = [dict(dep, value=value) for dep in spec["inputs"]]
+        return {"output": output, "outputs": _dependencies(output), "inputs": inputs,
+                        "state": [dict(dep, value=state) for dep in spec["state"]],
+                        "changedPropIds": [f"{input_id}.{spec['inputs'][0]['property']}"]}
+
+    def _post(self, input_id, value, state=None):
+        data = json.dumps(self._body(input_id, value, state))
+        response = self.client.post(self.url, data=data, content_type="application/json")
+        job = response.get_json() if response.status_code == 200 else None
+        # Background callback: se consulta el resultado con cacheKey y job
+        deadline = time.monotonic() + self.timeout
+        while job and "cacheKey" in job and "response" not in job:
+            if time.monotonic() > deadline:
+                return {}
+            time.sleep(self.poll)
+            response = self.client.post(self.url, data=data, content_type="application/json",
+                                        query_string={"cacheKey": job["cacheKey"], "job": job["job"]})
+            if response.status_code != 200:
+                return {}
+            result = response.get_json()
+            if "response" in result:
+                job = result
+        return job.get("response", {}) if job else {}
+
+    def search(self, button, pending, graph, query):
+        """Devuelve (hay figura, salió de la caché, segundos hasta el resultado)."""
+        start = time.perf_counter()
+        response = self._post(button, 1, query)
+        data = response[pending]["data"]
+        cached = graph in response
+        elapsed = time.perf_counter() - start
+        # Como el navegador: el Store pendiente siempre cambia y dispara el
+        # background callback (que sin búsqueda pendiente no hace nada)
+        background = self._post(pending, data)
+        if not cached:
+            response = background
+            elapsed = time.perf_counter() - start
+        return bool(response.get(graph, {}).get("figure")), cached, elapsed
+
+
+def _app():
+    # Importar la app registra las páginas y sus callbacks
+    import app
+
+    return app.app
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        return (values[0] if values else 0.0,) * 3
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return q[49], q[94], q[98]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="usuarios concurrentes")
+    parser.add_argument("--requests", type=int, default=200, help="búsquedas totales")
+    parser.add_argument("--cities", type=int, default=30, help="ciudades distintas (popularidad tipo Zipf)")
+    parser.add_argument("--mode", choices=["single", "compare"], default="single")
+    parser.add_argument("--batch", type=int, default=10, help="ciudades por comparación (--mode compare)")
+    parser.add_argument("--no-cache", action="store_true", help="desactiva las cachés (TTL 0)")
+    parser.add_argument("--poll", type=float, default=0.05,
+                        help="segundos entre consultas a un background callback")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="segundos máximos de espera por un background callback (cuenta como sin datos)")
+    parser.add_argument("--seed", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    apis = from_arguments(args, seed=args.seed)
+    base = apis.start()
+    cache_dir = tempfile.mkdtemp(prefix="bench-clima-")
+    _configure(base, cache_dir, args.no_cache)
+
+    app = _app()
+    import weather
+
+    app.server.test_client().get(app.config.routes_pathname_prefix)
+    if args.mode == "single":
+        target = ("btn-buscar", "clima-pendiente", "grafico-temp")
+    else:
+        target = ("btn-comparar", "comparacion-pendiente", "grafico-comparacion")
+
+    rng = random.Random(args.seed)
+    cities = [f"ciudad {i}" for i in range(args.cities)]
+    weights = [1 / (i + 1) for i in range(len(cities))]
+    if args.mode == "single":
+        work = rng.choices(cities, weights=weights, k=args.requests)
+    else:
+        work = ["\n".join(rng.choices(cities, weights=weights, k=args.batch)) for _ in range(args.requests)]
+
+    users = threading.local()
+
+    def run(query):
+        if not hasattr(users, "client"):
+            users.client = ClimaClient(app, args.poll, args.timeout)
+        ok, cached, elapsed = users.client.search(*target, query)
+        return elapsed, ok, cached
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        results = list(pool.map(run, work))
+    wall = time.perf_counter() - start
+    apis.stop()
+
+    latencies = sorted(elapsed for elapsed, _, _ in results)
+    failures = sum(not ok for _, ok, _ in results)
+    from_cache = sum(cached for _, _, cached in results)
+    p50, p95, p99 = _percentiles(latencies)
+
+    print(f"modo: {args.mode}  usuarios: {args.users}  peticiones: {len(results)}  "
+          f"latencia upstream: {args.latency * 1000:.0f} ms  errores upstream: {args.error_rate:.0%}")
+    print(f"throughput:   {len(results) / wall:8.1f} req/s  ({wall:.2f} s)")
+    print(f"latencia p50: {p50 * 1000:8.1f} ms")
+    print(f"latencia p95: {p95 * 1000:8.1f} ms")
+    print(f"latencia p99: {p99 * 1000:8.1f} ms")
+    print(f"sin datos:    {failures:8d}")
+    print(f"desde caché:  {from_cache:8d}  (background: {len(results) - from_cache})")
+    print(f"upstream:     {apis.counts}")
+    # Solo el proceso del servidor: los jobs en background son procesos aparte
+    for name, cache in (("geocode", weather.geocode_cache), ("forecast", weather.forecast_cache)):
+        stats = cache.stats()
+        print(f"caché {name:9s} hit ratio {stats['hit_ratio']:.1%}  "
+              f"(hits {stats['hits']}, stale {stats['stale_hits']}, misses {stats['misses']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Bytes en la red y costo de CPU de comprimir las respuestas de los callbacks.
+
+Genera las respuestas reales de cada tipo de callback (figura completa,
+varias figuras, Patch de zoom, Patch del campo de fase) con la codificación
+actual de la app y las comprime con gzip y, si está instalado, brotli en
+varios niveles. Reporta bytes sin comprimir, bytes comprimidos, razón de
+compresión y la mediana del tiempo de compresión por respuesta.
+
+    python -m bench.compression
+    python -m bench.compression --repeat 50 --tmax 20000
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_LEVELS = (1, 4, 6, 11)
+
+
+def _pages():
+    os.environ.setdefault("MODELOS_BACKGROUND_CACHE_PATH", tempfile.mkdtemp(prefix="bench-compression-"))
+    import dash
+    import app  # noqa: F401
+
+    return [sys.modules[p["module"]] for p in dash.page_registry.values()]
+
+
+def _responses(args):
+    """Cuerpos de respuesta de ``/_dash-update-component`` por tipo de callback."""
+    from plotly.io.json import to_json_plotly
+
+    pages = _pages()
+    sir = next(m for m in pages if hasattr(m, "update_sir"))
+    seir = next(m for m in pages if hasattr(m, "update_seir"))
+    predprey = next(m for m in pages if hasattr(m, "update_predprey_graph"))
+
+    sir_params = (990, 10, 0, 0.002, 0.5, 60)
+    lv_params = (1.0, 0.1, 1.5, 0.075)
+    time_fig, phase_fig, invariant_fig, viewport, _ = predprey.update_predprey_graph(
+        40, 9, *lv_params, args.tmax, "symplectic", 25)
+    x0, x1, y0, y1 = viewport["current"]
+    phase_relayout = {"xaxis.range[0]": x0, "xaxis.range[1]": (x0 + x1) / 2,
+                      "yaxis.range[0]": y0, "yaxis.range[1]": (y0 + y1) / 2}
+
+    outputs = {
+        "SIR (figura)": [sir.update_sir(*sir_params)[0]],
+        "SEIR (figura)": [seir.update_seir(990, 5, 5, 0, 0.002, 0.3, 0.5, 80)[0]],
+        "LV (3 figuras)": [time_fig, phase_fig, invariant_fig],
+        "SIR ensamble": list(sir.update_sir_ensemble(1, *sir_params, 20, 20, 0, 1000)[:2]),
+        "SIR estocástico": list(sir.update_sir_stochastic(1, *sir_params, 1000, "auto")[:2]),
+        "SIR zoom (Patch)": [sir.zoom_sir({"xaxis.range[0]": 10, "xaxis.range[1]": 20}, *sir_params)],
+        "LV campo (Patch)": [predprey.update_phase_field(phase_relayout, viewport, *lv_params, 25)[0]],
+    }
+    # Misma forma que el JSON de Dash para callbacks con varias salidas
+    return {
+        name: to_json_plotly({"multi": True, "response": {f"salida-{i}": {"figure": value}
+                                                           for i, value in enumerate(values)}}).encode()
+        for name, values in outputs.items()
+    }
+
+
+def _codecs():
+    codecs = {f"gzip {level}": (lambda data, level=level: gzip.compress(data, compresslevel=level))
+              for level in GZIP_LEVELS}
+    try:
+        import brotli
+    except ImportError:
+        return codecs
+    codecs.update({f"br {level}": (lambda data, level=level: brotli.compress(data, quality=level))
+                   for level in BROTLI_LEVELS})
+    return codecs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tmax", type=float, default=10_000, help="horizonte de Lotka–Volterra")
+    parser.add_argument("--repeat", type=int, default=20, help="repeticiones por medición")
+    args = parser.parse_args(argv)
+
+    responses = _responses(args)
+    codecs = _codecs()
+    if not any(name.startswith("br") for name in codecs):
+        print("brotli no está instalado: solo se mide gzip\n")
+
+    print(f"{'callback':20s} {'códec':8s} {'bytes':>10s} {'en la red':>10s} {'razón':>7s} {'ms':>8s}")
+    for name, body in responses.items():
+        for label, compress in codecs.items():
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                packed = compress(body)
+                times.append(time.perf_counter() - start)
+            print(f"{name:20s} {label:8s} {len(body):10,d} {len(packed):10,d} "
+                  f"{len(body) / len(packed):6.1f}x {statistics.median(times) * 1000:8.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark del tamaño y el costo de serializar las figuras de los callbacks.
+
+Genera las figuras de las páginas SIR, SEIR y Lotka–Volterra (y la del
+ensamble SIR) con los mismos callbacks de la app y las serializa como las
+mandaría Dash, en cada combinación de formato y serializador:
+
+    listas     arreglos como listas de decimales (formato anterior; con
+               plotly.py >= 6 se decodifican los bdata que ya trae la figura)
+    bdata f8   arreglos tipados de plotly.js en float64
+    bdata f4   arreglos tipados en float32 (MODELOS_FLOAT32=1)
+
+con el motor ``json`` de la biblioteca estándar y ``orjson`` si está
+instalado. Reporta bytes por respuesta (y comprimida con gzip) y la mediana
+del tiempo de codificar y serializar.
+
+    python -m bench.encoding
+    python -m bench.encoding --tmax 20000 --repeat 50
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _pages():
+    # Figuras sin codificar: el benchmark aplica cada formato por su cuenta
+    os.environ["MODELOS_TYPED_ARRAYS"] = "0"
+    os.environ.setdefault("MODELOS_BACKGROUND_CACHE_PATH", tempfile.mkdtemp(prefix="bench-encoding-"))
+    import dash
+    import app  # noqa: F401
+
+    return [sys.modules[p["module"]] for p in dash.page_registry.values()]
+
+
+def _figures(args):
+    pages = _pages()
+    sir = next(m for m in pages if hasattr(m, "update_sir"))
+    seir = next(m for m in pages if hasattr(m, "update_seir"))
+    predprey = next(m for m in pages if hasattr(m, "update_predprey_graph"))
+
+    time_fig, phase_fig, invariant_fig, _, _ = predprey.update_predprey_graph(
+        40, 9, 1.0, 0.1, 1.5, 0.075, args.tmax, "symplectic", 25)
+    ensemble_fig, _, _ = sir.update_sir_ensemble(1, 990, 10, 0, 0.002, 0.5, 60, 20, 20, 0, 1000)
+    return {
+        "SIR": sir.update_sir(990, 10, 0, 0.002, 0.5, 60)[0],
+        "SEIR": seir.update_seir(990, 5, 5, 0, 0.002, 0.3, 0.5, 80)[0],
+        "SIR ensamble": ensemble_fig,
+        f"LV tiempo (t={args.tmax:g})": time_fig,
+        "LV fase": phase_fig,
+        "LV invariante": invariant_fig,
+    }
+
+
+def _as_lists(value):
+    import numpy as np
+    from figures import decode_array
+
+    if isinstance(value, dict) and "bdata" in value and "dtype" in value:
+        return decode_array(value).tolist()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _as_lists(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_as_lists(item) for item in value]
+    return value
+
+
+def _formats():
+    from figures import encode_figure
+
+    return {
+        "listas": lambda fig: _as_lists(fig.to_plotly_json()),
+        "bdata f8": lambda fig: encode_figure(fig, float32=False),
+        "bdata f4": lambda fig: encode_figure(fig, float32=True),
+    }
+
+
+def _engines():
+    engines = ["json"]
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        engines.append("orjson")
+    return engines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tmax", type=float, default=10_000, help="horizonte de Lotka–Volterra")
+    parser.add_argument("--repeat", type=int, default=20, help="repeticiones por medición")
+    args = parser.parse_args(argv)
+
+    from plotly.io.json import to_json_plotly
+
+    figures = _figures(args)
+    formats = _formats()
+    engines = _engines()
+    if len(engines) == 1:
+        print("orjson no está instalado: solo se mide el motor json\n")
+
+    print(f"{'figura':24s} {'formato':10s} {'motor':7s} {'bytes':>10s} {'gzip':>9s} {'ms':>8s}")
+    totals = {}
+    for name, fig in figures.items():
+        for label, encode in formats.items():
+            for engine in engines:
+                times = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    body = to_json_plotly(encode(fig), engine=engine)
+                    times.append(time.perf_counter() - start)
+                raw = body.encode()
+                size, packed, elapsed = len(raw), len(gzip.compress(raw)), statistics.median(times)
+                total = totals.setdefault((label, engine), [0, 0, 0.0])
+                total[0] += size
+                total[1] += packed
+                total[2] += elapsed
+                print(f"{name:24s} {label:10s} {engine:7s} {size:10,d} {packed:9,d} {elapsed * 1000:8.2f}")
+        print()
+
+    base_size, _, base_time = totals[("listas", "json")]
+    print("totales (relativos a listas + json)")
+    for (label, engine), (size, packed, elapsed) in totals.items():
+        print(f"{label:10s} {engine:7s} {size:10,d} B ({size / base_size:6.1%})  gzip {packed:9,d} B  "
+              f"{elapsed * 1000:8.2f} ms ({elapsed / base_time:6.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Servidor local que imita a Nominatim y a Open-Meteo.
+
+Sirve ``/search`` (geocodificación) y ``/v1/forecast`` (pronóstico, con la
+forma de varias coordenadas separadas por comas) con latencia, tasa de error
+y tamaño de respuesta configurables. Los datos son deterministas: la misma
+ciudad siempre cae en las mismas coordenadas.
+
+Uso independiente, para correr la app contra él:
+
+    python -m bench.fake_apis --port 8765 --latency 0.2
+    MODELOS_NOMINATIM_URL=http://127.0.0.1:8765/search \
+    MODELOS_OPEN_METEO_URL=http://127.0.0.1:8765/v1/forecast python app.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeAPIs:
+    def __init__(self, latency=0.1, jitter=0.02, error_rate=0.0, not_found_rate=0.0,
+                 hours=168, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        self.hours = hours
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {'search': 0, 'forecast': 0, 'forecast_locations': 0, 'errors': 0}
+        self.server = None
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def _delay_and_fail(self):
+        with self._lock:
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter))
+            fail = self.random.random() < self.error_rate
+        time.sleep(delay)
+        return fail
+
+    @staticmethod
+    def _digest(text):
+        return int(hashlib.sha256(text.encode()).hexdigest(), 16)
+
+    def search(self, query):
+        h = self._digest(query)
+        if (h % 10_000) / 10_000 < self.not_found_rate:
+            return []
+        lat = (h % 17_000) / 100 - 85
+        lon = ((h // 17_000) % 36_000) / 100 - 180
+        return [{"lat": f"{lat:.4f}", "lon": f"{lon:.4f}", "display_name": f"{query.title()}, Fakeland"}]
+
+    def forecast(self, lat, lon):
+        start = datetime(2024, 1, 1)
+        times = [(start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(self.hours)]
+        base = 25 - abs(lat) / 3
+        temps = [round(base + 6 * math.sin(2 * math.pi * (i + lon / 15) / 24), 1) for i in range(self.hours)]
+        return {
+            "latitude": lat, "longitude": lon,
+            "hourly_units": {"time": "iso8601", "temperature_2m": "°C"},
+            "hourly": {"time": times, "temperature_2m": temps},
+        }
+
+    def handler(self):
+        apis = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                if apis._delay_and_fail():
+                    apis._count('errors')
+                    self._send(503, {"error": True, "reason": "fake outage"})
+                elif url.path == "/search":
+                    apis._count('search')
+                    self._send(200, apis.search(params.get("q", [""])[0]))
+                elif url.path == "/v1/forecast":
+                    lats = [float(v) for v in params["latitude"][0].split(",")]
+                    lons = [float(v) for v in params["longitude"][0].split(",")]
+                    apis._count('forecast')
+                    apis._count('forecast_locations', len(lats))
+                    locations = [apis.forecast(lat, lon) for lat, lon in zip(lats, lons)]
+                    self._send(200, locations if len(locations) > 1 else locations[0])
+                else:
+                    self._send(404, {"error": True, "reason": "not found"})
+
+        return Handler
+
+    def start(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_port}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.1, help="latencia media por petición (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="desviación de la latencia (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fracción de respuestas 503")
+    parser.add_argument("--not-found-rate", type=float, default=0.0, help="fracción de ciudades inexistentes")
+    parser.add_argument("--hours", type=int, default=168, help="horas por pronóstico (tamaño de respuesta)")
+
+
+def from_arguments(args, seed=0):
+    return FakeAPIs(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                    not_found_rate=args.not_found_rate, hours=args.hours, seed=seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    apis = from_arguments(args)
+    base = apis.start(port=args.port)
+    print(f"Nominatim falso:  {base}/search")
+    print(f"Open-Meteo falso: {base}/v1/forecast")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        apis.stop()
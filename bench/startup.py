@@ -0,0 +1,121 @@
+"""Tiempo de arranque en frío de la app y de cada página.
+
+Importa ``app`` en un intérprete nuevo con ``python -X importtime`` (lo que
+hace cada worker al arrancar: Dash importa todos los módulos de ``pages/``)
+y reporta:
+
+* el tiempo total hasta tener ``app.server`` listo;
+* el tiempo acumulado de cada página (incluye las dependencias que esa
+  página fue la primera en importar);
+* los paquetes con más tiempo propio de importación;
+* las dependencias pesadas que se cargaron al arrancar (scipy, pandas,
+  plotly.express, numba). Solo pandas y plotly.express están permitidas:
+  la página de clima las importa a propósito para que los procesos de sus
+  background callbacks las hereden. ``requests`` no se revisa: Dash mismo
+  lo importa.
+
+Con ``--budget`` el comando termina con código 1 si el arranque pasa del
+presupuesto o si alguna dependencia diferida no permitida se cargó al
+arrancar. tests/test_startup.py hace el mismo chequeo con pytest.
+
+    python -m bench.startup
+    python -m bench.startup --budget 3 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se importan dentro de los callbacks que las usan, no al arrancar
+DEFERRED = ('scipy', 'pandas', 'plotly.express', 'numba')
+# Salvo estas: pages/13_clima.py las carga al arrancar y cada background
+# callback (un fork del worker) las hereda en vez de importarlas de nuevo
+STARTUP_ALLOWED = ('pandas', 'plotly.express')
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+loaded = [name for name in {deferred!r} if name in sys.modules]
+print(json.dumps({{'elapsed': elapsed, 'loaded': loaded}}))
+"""
+
+
+def cold_start(cache_dir):
+    """Importa la app en un proceso nuevo; devuelve (resultado, líneas de importtime)."""
+    env = dict(os.environ, MODELOS_BACKGROUND_CACHE_PATH=os.path.join(cache_dir, 'background'),
+               PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(deferred=DEFERRED)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result, [line for line in proc.stderr.splitlines() if line.startswith('import time:')]
+
+
+def parse_importtime(lines):
+    """Líneas de ``-X importtime`` como (módulo, propio µs, acumulado µs)."""
+    modules = []
+    for line in lines:
+        fields = line.split(':', 1)[1].split('|')
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        try:
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue  # encabezado
+    return modules
+
+
+def report(modules, top):
+    pages = [(name, cumulative) for name, _, cumulative in modules if name.startswith('pages.')]
+    print("páginas (acumulado, incluye lo que cada una importó primero)")
+    for name, cumulative in sorted(pages, key=lambda item: -item[1]):
+        print(f"  {name:45s} {cumulative / 1000:8.1f} ms")
+
+    packages = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split('.')[0]] += self_us
+    print(f"\npaquetes con más tiempo propio (top {top})")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:45s} {self_us / 1000:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="arranques a medir (se reporta la mediana)")
+    parser.add_argument("--budget", type=float, default=None, help="presupuesto de arranque en segundos")
+    parser.add_argument("--top", type=int, default=15, help="paquetes a listar")
+    args = parser.parse_args(argv)
+
+    cache_dir = tempfile.mkdtemp(prefix="bench-startup-")
+    runs = [cold_start(cache_dir) for _ in range(max(args.runs, 1))]
+    elapsed = statistics.median(result['elapsed'] for result, _ in runs)
+    result, lines = runs[-1]
+
+    report(parse_importtime(lines), args.top)
+    print(f"\narranque en frío (import app, mediana de {len(runs)}): {elapsed:.2f} s")
+    unexpected = [name for name in result['loaded'] if name not in STARTUP_ALLOWED]
+    if result['loaded']:
+        print(f"dependencias diferidas cargadas al arrancar: {', '.join(result['loaded'])}"
+              f" (permitidas: {', '.join(STARTUP_ALLOWED)})")
+
+    if args.budget is None:
+        return 0
+    over = elapsed > args.budget
+    print(f"presupuesto {args.budget:.2f} s: {'excedido' if over else 'ok'}")
+    if unexpected:
+        print(f"no permitidas: {', '.join(unexpected)}")
+    return 1 if over or unexpected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
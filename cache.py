@@ -0,0 +1,314 @@
+"""Cachés de la aplicación.
+
+``model_cache`` guarda resultados de los modelos: arreglos y valores resumen
+(nunca componentes de Dash), con una clave formada por el nombre del modelo y
+los parámetros normalizados. Hay un LRU en memoria por proceso y,
+opcionalmente, un respaldo en SQLite que comparten todos los workers de
+gunicorn. ``PersistentCache`` sirve para datos externos con TTL.
+"""
+import functools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import MODEL_CACHE_BACKEND, MODEL_CACHE_PATH, MODEL_CACHE_SIZE
+
+_MISSING = object()
+
+
+def _quantize(value, digits):
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # 10, 10.0 y 10.000000000001 caen en la misma entrada
+        return float(f"{float(value):.{digits}g}")
+    if isinstance(value, (list, tuple)):
+        return tuple(_quantize(v, digits) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _quantize(v, digits)) for k, v in value.items()))
+    return value
+
+
+def normalize_key(model, args=(), kwargs=None, digits=10):
+    key = (model, _quantize(tuple(args), digits))
+    if kwargs:
+        key += (_quantize(kwargs, digits),)
+    return key
+
+
+def _freeze(value):
+    # Los resultados se comparten entre llamadas: nadie debe modificarlos
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    return value
+
+
+class LRUCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteStore:
+    """Almacén clave-valor en disco, seguro entre procesos.
+
+    Las entradas pueden tener TTL; cuando hay más de ``maxsize`` filas se
+    descartan las de acceso más antiguo.
+    """
+
+    def __init__(self, path, maxsize=None, table='entries'):
+        self.path = path
+        self.maxsize = maxsize
+        self.table = table
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)"
+        )
+
+    @staticmethod
+    def _key(key):
+        return key if isinstance(key, str) else repr(key)
+
+    def _conn(self):
+        # Una conexión por hilo y por proceso: no se reutilizan tras un fork
+        # (workers de gunicorn, procesos de los background callbacks)
+        pid, conn = getattr(self._local, 'conn', (None, None))
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+    def get(self, key, default=None, with_expiry=False):
+        row = self._conn().execute(
+            f"SELECT value, expires FROM {self.table} WHERE key = ?", (self._key(key),)
+        ).fetchone()
+        now = time.time()
+        if row is None or (row[1] is not None and row[1] < now and not with_expiry):
+            return (default, None) if with_expiry else default
+        self._conn().execute(
+            f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, self._key(key))
+        )
+        value = pickle.loads(row[0])
+        return (value, row[1]) if with_expiry else value
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + ttl if ttl is not None else None
+        conn = self._conn()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires, accessed) "
+            "VALUES (?, ?, ?, ?)",
+            (self._key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires, now),
+        )
+        if self.maxsize:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def items(self, limit=-1):
+        """(clave, valor, expira) de las entradas vigentes, de la más reciente a la más antigua."""
+        rows = self._conn().execute(
+            f"SELECT key, value, expires FROM {self.table} "
+            "WHERE expires IS NULL OR expires >= ? ORDER BY accessed DESC LIMIT ?",
+            (time.time(), limit),
+        ).fetchall()
+        for key, value, expires in rows:
+            yield key, pickle.loads(value), expires
+
+    def purge_expired(self):
+        self._conn().execute(
+            f"DELETE FROM {self.table} WHERE expires IS NOT NULL AND expires < ?", (time.time(),)
+        )
+
+    def clear(self):
+        self._conn().execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class ModelCache:
+    def __init__(self, maxsize=256, backend=None):
+        self.memory = LRUCache(maxsize)
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count('hits')
+            return value
+        if self.backend is not None:
+            value = self.backend.get(key, _MISSING)
+            if value is not _MISSING:
+                self._count('backend_hits')
+                self.memory.set(key, _freeze(value))
+                return value
+        self._count('misses')
+        return default
+
+    def set(self, key, value):
+        self.memory.set(key, _freeze(value))
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.backend is not None:
+            self.backend.clear()
+        with self._lock:
+            self.hits = self.backend_hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.backend_hits + self.misses
+        return {
+            'hits': self.hits,
+            'backend_hits': self.backend_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.backend_hits) / lookups if lookups else 0.0,
+            'size': len(self.memory),
+            'maxsize': self.memory.maxsize,
+            'backend': type(self.backend).__name__ if self.backend is not None else None,
+        }
+
+
+class PersistentCache:
+    """LRU en memoria sobre un SQLiteStore, con TTL por entrada.
+
+    Pensado para datos externos (geocodificación, pronósticos): las entradas
+    sobreviven a reinicios y ``warm()`` las carga en memoria al arrancar, así
+    que una consulta repetida no toca ni el disco ni la red. Las claves deben
+    ser cadenas de texto para que ``warm()`` las recupere tal cual.
+    """
+
+    def __init__(self, path, table, maxsize=1024):
+        self.memory = LRUCache(maxsize)
+        self.store = SQLiteStore(path, maxsize=maxsize * 4, table=table)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def warm(self):
+        self.store.purge_expired()
+        entries = list(self.store.items(limit=self.memory.maxsize))
+        # De la más antigua a la más reciente, para respetar el orden LRU
+        for key, value, expires in reversed(entries):
+            self.memory.set(key, (value, expires))
+        return len(entries)
+
+    def lookup(self, key):
+        """Devuelve (valor, expira), incluso si la entrada ya venció."""
+        entry = self.memory.get(key, _MISSING)
+        if entry is _MISSING:
+            value, expires = self.store.get(key, _MISSING, with_expiry=True)
+            if value is _MISSING:
+                return _MISSING, None
+            entry = (value, expires)
+            self.memory.set(key, entry)
+        return entry
+
+    def get(self, key, default=None, allow_stale=False):
+        value, expires = self.lookup(key)
+        if value is _MISSING:
+            self._count('misses')
+            return (default, False) if allow_stale else default
+        stale = expires is not None and expires < time.time()
+        if stale and not allow_stale:
+            self._count('misses')
+            return default
+        self._count('stale_hits' if stale else 'hits')
+        return (value, stale) if allow_stale else value
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl is not None else None
+        self.memory.set(key, (value, expires))
+        self.store.set(key, value, ttl)
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            'size': len(self.memory),
+        }
+
+
+def _make_model_cache():
+    backend = None
+    if MODEL_CACHE_BACKEND == 'sqlite':
+        backend = SQLiteStore(MODEL_CACHE_PATH, maxsize=MODEL_CACHE_SIZE * 8, table='models')
+    return ModelCache(MODEL_CACHE_SIZE, backend)
+
+
+model_cache = _make_model_cache()
+
+
+def cached_model(name, cache=None):
+    """Decorador para funciones puras que devuelven resultados de un modelo."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = cache or model_cache
+            key = normalize_key(name, args, kwargs)
+            value = target.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                target.set(key, value)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,119 @@
+import os
+
+
+def env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Los modelos con solución cerrada se evalúan en el navegador
+# (assets/models.js). Con MODELOS_CLIENTSIDE=0 se vuelve a los callbacks
+# del servidor.
+CLIENTSIDE_CALLBACKS = env_flag('MODELOS_CLIENTSIDE', True)
+
+# Caché de resultados de los modelos (cache.py). Con MODELOS_CACHE_BACKEND=sqlite
+# los workers comparten un respaldo en disco además del LRU en memoria.
+MODEL_CACHE_SIZE = int(os.environ.get('MODELOS_CACHE_SIZE', 256))
+MODEL_CACHE_BACKEND = os.environ.get('MODELOS_CACHE_BACKEND', 'memory')
+MODEL_CACHE_PATH = os.environ.get('MODELOS_CACHE_PATH', os.path.join('.cache', 'models.sqlite'))
+
+# Servicios externos de la página de clima (weather.py). Se pueden apuntar a
+# los servidores falsos de bench/fake_apis.py para medir sin internet.
+NOMINATIM_URL = os.environ.get('MODELOS_NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+OPEN_METEO_URL = os.environ.get('MODELOS_OPEN_METEO_URL', 'https://api.open-meteo.com/v1/forecast')
+# La política de uso de Nominatim permite una petición por segundo: las
+# geocodificaciones que no están en caché se espacian NOMINATIM_MIN_INTERVAL
+# segundos entre todos los procesos (0 lo desactiva). Open-Meteo no se limita.
+NOMINATIM_MIN_INTERVAL = float(os.environ.get('MODELOS_NOMINATIM_MIN_INTERVAL', 1.0))
+
+# Caché persistente de geocodificación (weather.py)
+GEOCODE_CACHE_PATH = os.environ.get('MODELOS_GEOCODE_CACHE_PATH', os.path.join('.cache', 'geocode.sqlite'))
+GEOCODE_TTL = float(os.environ.get('MODELOS_GEOCODE_TTL', 30 * 24 * 3600))
+GEOCODE_NEGATIVE_TTL = float(os.environ.get('MODELOS_GEOCODE_NEGATIVE_TTL', 24 * 3600))
+
+# Caché de pronósticos (weather.py): las coordenadas se ajustan a una malla de
+# FORECAST_GRID grados y las entradas vencen con cada actualización horaria de
+# Open-Meteo. Una entrada vencida se sirve de inmediato mientras se refresca en
+# segundo plano, salvo que tenga más de FORECAST_MAX_STALE segundos.
+FORECAST_CACHE_PATH = os.environ.get('MODELOS_FORECAST_CACHE_PATH', os.path.join('.cache', 'forecast.sqlite'))
+FORECAST_GRID = float(os.environ.get('MODELOS_FORECAST_GRID', 0.1))
+FORECAST_UPDATE_INTERVAL = float(os.environ.get('MODELOS_FORECAST_UPDATE_INTERVAL', 3600))
+FORECAST_MAX_STALE = float(os.environ.get('MODELOS_FORECAST_MAX_STALE', 24 * 3600))
+
+# Cliente HTTP compartido (http_client.py)
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('MODELOS_HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get('MODELOS_HTTP_READ_TIMEOUT', 10))
+HTTP_RETRIES = int(os.environ.get('MODELOS_HTTP_RETRIES', 2))
+HTTP_BACKOFF = float(os.environ.get('MODELOS_HTTP_BACKOFF', 0.3))
+HTTP_POOL_MAXSIZE = int(os.environ.get('MODELOS_HTTP_POOL_MAXSIZE', 10))
+
+# Directorio de diskcache para los background callbacks (app.py)
+BACKGROUND_CACHE_PATH = os.environ.get('MODELOS_BACKGROUND_CACHE_PATH', os.path.join('.cache', 'background'))
+
+# Comparación de varias ciudades (weather.comparar_ciudades)
+FORECAST_BATCH_SIZE = int(os.environ.get('MODELOS_FORECAST_BATCH_SIZE', 50))
+WEATHER_MAX_CITIES = int(os.environ.get('MODELOS_WEATHER_MAX_CITIES', 50))
+WEATHER_MAX_WORKERS = int(os.environ.get('MODELOS_WEATHER_MAX_WORKERS', 4))
+
+# Los kernels del SEIR (epidemics.py) se compilan con Numba si está instalado.
+# MODELOS_NUMBA=0 fuerza la versión en NumPy.
+USE_NUMBA = env_flag('MODELOS_NUMBA', True)
+
+# Simulaciones estocásticas (epidemics.run_replicates): Gillespie exacto hasta
+# GILLESPIE_MAX_N individuos (también el tope si se fuerza Gillespie),
+# tau-leaping por encima; las réplicas se reparten en un pool de
+# STOCHASTIC_WORKERS procesos que cada worker del servidor crea una vez.
+GILLESPIE_MAX_N = int(os.environ.get('MODELOS_GILLESPIE_MAX_N', 2000))
+STOCHASTIC_WORKERS = int(os.environ.get('MODELOS_STOCHASTIC_WORKERS', os.cpu_count() or 1))
+
+# Nivel de detalle de las figuras (figures.downsample_figure): cada traza de
+# líneas se reduce a LOD_POINTS puntos con LTTB o con decimación min/max.
+LOD_POINTS = int(os.environ.get('MODELOS_LOD_POINTS', 2000))
+LOD_METHOD = os.environ.get('MODELOS_LOD_METHOD', 'lttb')
+# Al hacer zoom, la ventana visible se vuelve a evaluar con ZOOM_POINTS puntos
+# (figures.zoom_window); las trazas con más de WEBGL_THRESHOLD puntos se
+# dibujan con Scattergl.
+ZOOM_POINTS = int(os.environ.get('MODELOS_ZOOM_POINTS', 1000))
+WEBGL_THRESHOLD = int(os.environ.get('MODELOS_WEBGL_THRESHOLD', 1000))
+
+# Codificación de las respuestas (figures.prepare_figure): los arreglos NumPy
+# de las figuras viajan como arreglos tipados de plotly.js (base64, requiere
+# plotly.js >= 2.28); MODELOS_FLOAT32=1 los manda en precisión simple. Funciona
+# con plotly.py 5 (arreglos NumPy) y con plotly.py >= 6, que ya codifica en f8
+# y figures.encode_figure vuelve a codificar.
+# JSON_ENGINE es el serializador de plotly.io que usa Dash ('auto' toma orjson
+# si está instalado).
+TYPED_ARRAYS = env_flag('MODELOS_TYPED_ARRAYS', True)
+FIGURE_FLOAT32 = env_flag('MODELOS_FLOAT32', False)
+JSON_ENGINE = os.environ.get('MODELOS_JSON_ENGINE', 'auto')
+
+# Caché del navegador para los assets estáticos (app.py). Los que Dash enlaza
+# con ?m=<mtime> y las fuentes (versión en el nombre) se sirven como inmutables.
+ASSET_MAX_AGE = int(os.environ.get('MODELOS_ASSET_MAX_AGE', 365 * 24 * 3600))
+
+# Fuente Outfit (app.font_head): tools/fetch_fonts.py descarga FONT_CSS_URL y
+# guarda el woff2 latino en assets/fonts/FONT_FILE. Si el archivo cambia hay
+# que subir la versión del nombre: las fuentes se sirven como inmutables.
+FONT_FILE = 'outfit-latin-v1.woff2'
+FONT_CSS_URL = 'https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap'
+
+# Compresión de las respuestas (app.py, con flask-compress si está instalado):
+# brotli o gzip según el Accept-Encoding del navegador, solo para respuestas de
+# al menos COMPRESS_MIN_SIZE bytes. bench/compression.py mide el efecto de
+# cada nivel sobre las respuestas de los callbacks.
+COMPRESS = env_flag('MODELOS_COMPRESS', True)
+COMPRESS_ALGORITHMS = os.environ.get('MODELOS_COMPRESS_ALGORITHMS', 'br,gzip').split(',')
+COMPRESS_LEVEL = int(os.environ.get('MODELOS_COMPRESS_LEVEL', 6))
+COMPRESS_BR_LEVEL = int(os.environ.get('MODELOS_COMPRESS_BR_LEVEL', 4))
+COMPRESS_MIN_SIZE = int(os.environ.get('MODELOS_COMPRESS_MIN_SIZE', 1024))
+
+# Servidor de producción (wsgi.py): gunicorn con WEB_WORKERS procesos de
+# WEB_THREADS hilos. La app se precarga y se calienta (warmup.py) en el proceso
+# maestro antes de abrir el puerto; MODELOS_WARMUP=0 omite el calentamiento.
+WEB_BIND = os.environ.get('MODELOS_BIND', '0.0.0.0:8050')
+WEB_WORKERS = int(os.environ.get('MODELOS_WORKERS', os.cpu_count() or 1))
+WEB_THREADS = int(os.environ.get('MODELOS_THREADS', 4))
+WEB_TIMEOUT = int(os.environ.get('MODELOS_TIMEOUT', 120))
+WARMUP = env_flag('MODELOS_WARMUP', True)
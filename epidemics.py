@@ -0,0 +1,440 @@
+"""Motores numéricos de los modelos epidemiológicos (páginas 11 y 12)."""
+import os
+import threading
+
+import numpy as np
+
+from config import GILLESPIE_MAX_N, STOCHASTIC_WORKERS, USE_NUMBA
+
+
+# ------------------------------------------------------------
+#  Ensamble de parámetros para el SIR
+# ------------------------------------------------------------
+def sample_parameters(n, rng=None, **specs):
+    """Muestrea ``n`` conjuntos de parámetros.
+
+    Cada especificación puede ser un escalar (fijo), una tupla ``(min, max)``
+    (uniforme) o un callable ``f(rng, n)`` que devuelva ``n`` valores.
+    """
+    rng = np.random.default_rng(rng)
+    samples = {}
+    for name, spec in specs.items():
+        if callable(spec):
+            values = np.asarray(spec(rng, n), dtype=float)
+        elif isinstance(spec, (tuple, list)):
+            low, high = spec
+            values = rng.uniform(low, high, n)
+        else:
+            values = np.full(n, float(spec))
+        samples[name] = values
+    return samples
+
+
+def sir_ensemble(beta, gamma, s0, i0, r0, t, rtol=1e-6, atol=1e-6):
+    """Integra todas las trayectorias SIR juntas como un solo sistema.
+
+    Los parámetros son arreglos (o escalares) que se difunden a ``n``
+    miembros; el estado es una matriz (3, n) aplanada, así que cada paso del
+    integrador evalúa las ``n`` derivadas en una sola operación de NumPy.
+    Devuelve S, I, R con forma (n, len(t)).
+    """
+    beta, gamma, s0, i0, r0 = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (beta, gamma, s0, i0, r0))
+    )
+    n = beta.size
+    from scipy.integrate import solve_ivp
+
+    def rhs(_, y):
+        S, I, _R = y.reshape(3, n)
+        infection = beta * S * I
+        recovery = gamma * I
+        return np.concatenate([-infection, infection - recovery, recovery])
+
+    y0 = np.concatenate([s0, i0, r0])
+    sol = solve_ivp(rhs, (t[0], t[-1]), y0, t_eval=t, method='RK45', rtol=rtol, atol=atol)
+    if not sol.success:
+        raise RuntimeError(sol.message)
+    S, I, R = sol.y.reshape(3, n, -1)
+    return S, I, R
+
+
+def sir_solution(s0, i0, r0, beta, gamma, t_max, rtol=1e-8, atol=1e-8):
+    """Interpolante denso (``OdeSolution``) de un SIR en [0, t_max].
+
+    Usa LSODA, el mismo método de ``odeint``; el interpolante se evalúa en
+    cualquier malla (la completa o la ventana de un zoom) sin volver a integrar.
+    """
+    from scipy.integrate import solve_ivp
+
+    def rhs(_, y):
+        S, I, _R = y
+        infection = beta * S * I
+        recovery = gamma * I
+        return [-infection, infection - recovery, recovery]
+
+    sol = solve_ivp(rhs, (0, t_max), [s0, i0, r0], method='LSODA', rtol=rtol, atol=atol, dense_output=True)
+    if not sol.success:
+        raise RuntimeError(sol.message)
+    return sol.sol
+
+
+def quantile_bands(Y, quantiles=(0.05, 0.5, 0.95)):
+    """Cuantiles por instante de un arreglo (n, m): devuelve (len(quantiles), m)."""
+    return np.quantile(Y, quantiles, axis=0)
+
+
+def peak_statistics(t, I):
+    """Tamaño y momento del pico de infectados de cada trayectoria."""
+    idx = np.argmax(I, axis=1)
+    return I[np.arange(I.shape[0]), idx], np.asarray(t)[idx]
+
+
+# ------------------------------------------------------------
+#  SEIR determinista con Jacobiano analítico
+# ------------------------------------------------------------
+def _seir_rhs(y, beta, sigma, gamma):
+    S, E, I = y[0], y[1], y[2]
+    infection = beta * S * I
+    out = np.empty(4)
+    out[0] = -infection
+    out[1] = infection - sigma * E
+    out[2] = sigma * E - gamma * I
+    out[3] = gamma * I
+    return out
+
+
+def _seir_jac(y, beta, sigma, gamma):
+    S, I = y[0], y[2]
+    J = np.zeros((4, 4))
+    J[0, 0] = -beta * I
+    J[0, 2] = -beta * S
+    J[1, 0] = beta * I
+    J[1, 1] = -sigma
+    J[1, 2] = beta * S
+    J[2, 1] = sigma
+    J[2, 2] = -gamma
+    J[3, 2] = gamma
+    return J
+
+
+_KERNELS = {}
+
+
+def _seir_kernels():
+    """RHS y Jacobiano, compilados con Numba si está instalado y habilitado."""
+    if 'seir' not in _KERNELS:
+        rhs, jac, compiled = _seir_rhs, _seir_jac, False
+        if USE_NUMBA:
+            try:
+                from numba import njit
+            except ImportError:
+                pass
+            else:
+                rhs, jac, compiled = njit(cache=True)(rhs), njit(cache=True)(jac), True
+        _KERNELS['seir'] = (rhs, jac, compiled)
+    return _KERNELS['seir']
+
+
+# Pasos de la escala más rápida que un método explícito tolera en todo el
+# horizonte antes de que convenga uno implícito
+STIFF_STEPS = 1e3
+# Cociente entre la escala más rápida y la más lenta a partir del cual se usa
+# Radau directamente en lugar de dejar que LSODA cambie de método
+STIFF_RATIO = 1e4
+
+
+def stiffness(jac, t_span):
+    """Escalas de tiempo del sistema linealizado con Jacobiano ``jac``.
+
+    Devuelve (tasa más rápida × horizonte, cociente rápida/lenta); las tasas
+    más lentas que el propio horizonte cuentan como ``1/horizonte``.
+    """
+    rates = np.abs(np.linalg.eigvals(jac).real)
+    horizon = max(t_span[1] - t_span[0], np.finfo(float).tiny)
+    fast = rates.max()
+    positive = rates[rates > 0]
+    slow = max(positive.min(), 1 / horizon) if positive.size else 1 / horizon
+    return fast * horizon, fast / slow
+
+
+def choose_method(jac, t_span):
+    """RK45 si el problema no es rígido, Radau si lo es mucho y LSODA entre medias."""
+    steps, ratio = stiffness(jac, t_span)
+    if steps < STIFF_STEPS:
+        return 'RK45'
+    if ratio > STIFF_RATIO:
+        return 'Radau'
+    return 'LSODA'
+
+
+def seir(s0, e0, i0, r0, beta, sigma, gamma, t, method='auto', rtol=1e-6, atol=1e-8, dense_output=False):
+    """Integra el SEIR y devuelve ``(S, E, I, R, info)``.
+
+    Con ``method='auto'`` el método se elige a partir de los autovalores del
+    Jacobiano en la condición inicial (ver ``choose_method``); si el método
+    elegido falla se reintenta con Radau. ``info`` registra el método usado,
+    las evaluaciones del RHS y del Jacobiano y si los kernels están compilados;
+    con ``dense_output=True`` incluye además el interpolante denso en ``'solution'``.
+    """
+    from scipy.integrate import solve_ivp
+
+    rhs, jac, compiled = _seir_kernels()
+    t = np.asarray(t, dtype=float)
+    t_span = (t[0], t[-1])
+    y0 = np.array([s0, e0, i0, r0], dtype=float)
+    beta, sigma, gamma = float(beta), float(sigma), float(gamma)
+
+    def fun(_, y):
+        return rhs(y, beta, sigma, gamma)
+
+    def jacobian(_, y):
+        return jac(y, beta, sigma, gamma)
+
+    if method == 'auto':
+        method = choose_method(jacobian(t[0], y0), t_span)
+
+    nfev = njev = 0
+    for attempt in (method, 'Radau'):
+        # Los métodos explícitos no usan el Jacobiano
+        options = {} if attempt in ('RK45', 'RK23', 'DOP853') else {'jac': jacobian}
+        sol = solve_ivp(fun, t_span, y0, method=attempt, t_eval=t, rtol=rtol, atol=atol,
+                        dense_output=dense_output, **options)
+        nfev += sol.nfev
+        njev += sol.njev
+        if sol.success or attempt == 'Radau':
+            break
+    if not sol.success:
+        raise RuntimeError(sol.message)
+
+    S, E, I, R = sol.y
+    info = {'method': attempt, 'nfev': nfev, 'njev': njev, 'compiled': compiled}
+    if dense_output:
+        info['solution'] = sol.sol
+    return S, E, I, R, info
+
+
+# ------------------------------------------------------------
+#  SIR/SEIR estocásticos para poblaciones finitas
+# ------------------------------------------------------------
+# Misma convención que los modelos deterministas: contagio beta*S*I con
+# conteos absolutos. Las réplicas van en columnas: X tiene forma (k, réplicas).
+def _sir_propensities(X, p):
+    S, I, _ = X
+    return np.stack([p['beta'] * S * I, p['gamma'] * I])
+
+
+def _seir_propensities(X, p):
+    S, E, I, _ = X
+    return np.stack([p['beta'] * S * I, p['sigma'] * E, p['gamma'] * I])
+
+
+def _sir_leap(X, p, h, rng):
+    # Tau-leaping binomial: nunca deja compartimentos negativos
+    S, I, R = X
+    infections = rng.binomial(S, -np.expm1(-p['beta'] * I * h))
+    recoveries = rng.binomial(I, -np.expm1(-p['gamma'] * h))
+    return np.stack([S - infections, I + infections - recoveries, R + recoveries])
+
+
+def _seir_leap(X, p, h, rng):
+    S, E, I, R = X
+    infections = rng.binomial(S, -np.expm1(-p['beta'] * I * h))
+    onsets = rng.binomial(E, -np.expm1(-p['sigma'] * h))
+    recoveries = rng.binomial(I, -np.expm1(-p['gamma'] * h))
+    return np.stack([S - infections, E + infections - onsets, I + onsets - recoveries, R + recoveries])
+
+
+STOCHASTIC_MODELS = {
+    'sir': {
+        'compartments': ('S', 'I', 'R'),
+        'infectious': (1,),
+        # (compartimentos, reacciones): contagio, recuperación
+        'stoichiometry': np.array([[-1, 0], [1, -1], [0, 1]]),
+        'propensities': _sir_propensities,
+        'leap': _sir_leap,
+        'rates': ('gamma',),
+    },
+    'seir': {
+        'compartments': ('S', 'E', 'I', 'R'),
+        'infectious': (1, 2),
+        # contagio, fin de la incubación, recuperación
+        'stoichiometry': np.array([[-1, 0, 0], [1, -1, 0], [0, 1, -1], [0, 0, 1]]),
+        'propensities': _seir_propensities,
+        'leap': _seir_leap,
+        'rates': ('sigma', 'gamma'),
+    },
+}
+
+# Fracción de la tasa individual más rápida que puede avanzar un salto de tau
+TAU_EPSILON = 0.05
+# Tope de saltos por simulación: acota el costo con parámetros extremos
+TAU_MAX_STEPS = 20_000
+# Réplicas por bloque; cada bloque tiene su propia semilla hija
+REPLICATE_CHUNK = 1000
+
+
+def _initial_state(y0, replicates):
+    y0 = np.rint(np.asarray(y0, dtype=float)).astype(np.int64)
+    return np.repeat(y0[:, None], replicates, axis=1)
+
+
+def gillespie(model, y0, params, t, replicates=1, rng=None):
+    """Algoritmo exacto de Gillespie, vectorizado sobre las réplicas.
+
+    Cada iteración dispara un evento en todas las réplicas activas a la vez;
+    una réplica termina cuando su siguiente evento cae más allá de ``t[-1]``
+    (o no quedan eventos posibles). Devuelve los conteos en la malla ``t``,
+    con forma (compartimentos, réplicas, len(t)).
+    """
+    spec = STOCHASTIC_MODELS[model]
+    rng = np.random.default_rng(rng)
+    t = np.asarray(t, dtype=float)
+    m = t.size
+
+    X = _initial_state(y0, replicates)
+    out = np.empty((X.shape[0], replicates, m), dtype=np.int32)
+    now = np.full(replicates, t[0])
+    next_point = np.zeros(replicates, dtype=np.intp)
+    ids = np.arange(replicates)
+
+    while ids.size:
+        a = spec['propensities'](X, params)
+        total = a.sum(axis=0)
+        with np.errstate(divide='ignore'):
+            later = now + rng.standard_exponential(ids.size) / total
+
+        # El estado no cambia hasta el próximo evento: se copia a los puntos
+        # de la malla que caen antes de él
+        while True:
+            sel = np.flatnonzero(next_point < m)
+            sel = sel[t[next_point[sel]] < later[sel]]
+            if not sel.size:
+                break
+            out[:, ids[sel], next_point[sel]] = X[:, sel]
+            next_point[sel] += 1
+
+        active = next_point < m
+        if not active.all():
+            X, a, total, later = X[:, active], a[:, active], total[active], later[active]
+            next_point, ids = next_point[active], ids[active]
+
+        u = rng.random(ids.size) * total
+        reaction = np.minimum((np.cumsum(a, axis=0) < u).sum(axis=0), a.shape[0] - 1)
+        X = X + spec['stoichiometry'][:, reaction]
+        now = later
+
+    return out
+
+
+def default_tau(model, y0, params, t_span):
+    """Paso de tau-leaping: ``TAU_EPSILON`` sobre la tasa individual más rápida."""
+    spec = STOCHASTIC_MODELS[model]
+    fastest = max([params['beta'] * float(np.sum(y0))] + [params[name] for name in spec['rates']])
+    tau = TAU_EPSILON / fastest if fastest > 0 else np.inf
+    return max(tau, (t_span[1] - t_span[0]) / TAU_MAX_STEPS)
+
+
+def tau_leap(model, y0, params, t, replicates=1, rng=None, tau=None):
+    """Tau-leaping binomial, vectorizado sobre las réplicas.
+
+    Todas las réplicas avanzan juntas con saltos de (a lo más) ``tau``
+    ajustados para caer exactamente en la malla ``t``. Mismo formato de
+    salida que ``gillespie``.
+    """
+    spec = STOCHASTIC_MODELS[model]
+    rng = np.random.default_rng(rng)
+    t = np.asarray(t, dtype=float)
+    if tau is None:
+        tau = default_tau(model, y0, params, (t[0], t[-1]))
+
+    X = _initial_state(y0, replicates)
+    out = np.empty((X.shape[0], replicates, t.size), dtype=np.int32)
+    out[:, :, 0] = X
+    infectious = list(spec['infectious'])
+    for j in range(1, t.size):
+        if not X[infectious].any():
+            # Se extinguió en todas las réplicas: el estado ya no cambia
+            out[:, :, j:] = X[:, :, None]
+            break
+        dt = t[j] - t[j - 1]
+        steps = max(1, int(np.ceil(dt / tau)))
+        for _ in range(steps):
+            X = spec['leap'](X, params, dt / steps, rng)
+        out[:, :, j] = X
+    return out
+
+
+def _simulate_chunk(model, y0, params, t, replicates, method, seed):
+    simulate = gillespie if method == 'gillespie' else tau_leap
+    return simulate(model, y0, params, t, replicates, np.random.default_rng(seed))
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _process_pool():
+    """Pool de procesos del proceso actual, creado una vez y reutilizado.
+
+    Los procesos se crean con ``forkserver``: hacer fork desde un hilo de un
+    worker con varios hilos (gthread) puede heredar locks tomados. Tras un
+    fork del proceso dueño (workers de gunicorn) se crea un pool nuevo.
+    """
+    global _pool, _pool_pid
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=STOCHASTIC_WORKERS,
+                                        mp_context=multiprocessing.get_context('forkserver'))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def run_replicates(model, y0, params, t, replicates, seed=None, method='auto', workers=None):
+    """Corre ``replicates`` simulaciones estocásticas; devuelve ``(estados, método)``.
+
+    Con ``method='auto'`` se usa Gillespie exacto hasta ``GILLESPIE_MAX_N``
+    individuos y tau-leaping por encima; forzar Gillespie por encima de ese
+    tamaño es un ``ValueError``. Las réplicas se reparten en bloques de
+    ``REPLICATE_CHUNK`` con semillas hijas de ``SeedSequence(seed)``, así que
+    el resultado es el mismo con cualquier número de procesos.
+    """
+    population = np.sum(y0)
+    if method == 'auto':
+        method = 'gillespie' if population <= GILLESPIE_MAX_N else 'tau-leap'
+    elif method == 'gillespie' and population > GILLESPIE_MAX_N:
+        raise ValueError(f"Gillespie exacto solo admite hasta {GILLESPIE_MAX_N} individuos")
+    sizes = [min(REPLICATE_CHUNK, replicates - start) for start in range(0, replicates, REPLICATE_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(model, y0, params, t, size, method, child) for size, child in zip(sizes, seeds)]
+
+    workers = STOCHASTIC_WORKERS if workers is None else workers
+    if workers <= 1 or len(jobs) == 1:
+        chunks = [_simulate_chunk(*job) for job in jobs]
+    else:
+        chunks = list(_process_pool().map(_simulate_chunk, *zip(*jobs)))
+    return np.concatenate(chunks, axis=1), method
+
+
+def outbreak_statistics(model, states, minor_fraction=0.1):
+    """Tamaño del brote, picos y probabilidad de extinción temprana.
+
+    El tamaño del brote es el número de nuevos contagios (S₀ − S final). Una
+    réplica cuenta como extinguida si al final no quedan infecciosos y el
+    brote no pasó de ``minor_fraction`` de la población.
+    """
+    spec = STOCHASTIC_MODELS[model]
+    S = states[0]
+    population = states[:, 0, 0].sum()
+    size = S[:, 0] - S[:, -1]
+    infectious = states[list(spec['infectious'])].sum(axis=0)
+    extinct = (infectious[:, -1] == 0) & (size <= minor_fraction * population)
+    return {
+        'outbreak_size': size,
+        'peak': infectious.max(axis=1),
+        'extinct': extinct,
+        'extinction_probability': float(extinct.mean()),
+    }
@@ -0,0 +1,346 @@
+import base64
+import numbers
+
+import numpy as np
+from dash import Patch
+import plotly.graph_objects as go
+
+from config import FIGURE_FLOAT32, LOD_METHOD, LOD_POINTS, TYPED_ARRAYS, WEBGL_THRESHOLD, ZOOM_POINTS
+
+
+def evaluation_patch(trace_index, t_eval, p_eval):
+    """Mueve solo el marcador de evaluación de una figura ya dibujada.
+
+    Se usa en los callbacks de "Tiempo a Evaluar": en lugar de reenviar la
+    figura completa, el navegador recibe unas pocas operaciones sobre la
+    traza ``trace_index``.
+    """
+    patched = Patch()
+    patched['data'][trace_index]['x'] = [t_eval]
+    patched['data'][trace_index]['y'] = [p_eval]
+    patched['data'][trace_index]['text'] = [f"P({t_eval}) = {p_eval:.2f}"]
+    return patched
+
+
+def add_quantile_band(fig, t, bands, name, rgb):
+    """Mediana y banda 5–95% de un ensamble (``bands`` = cuantiles 0.05, 0.5, 0.95)."""
+    low, median, high = bands
+    fig.add_trace(go.Scatter(x=t, y=low, mode='lines', line=dict(width=0),
+                             showlegend=False, hoverinfo='skip', legendgroup=name))
+    fig.add_trace(go.Scatter(x=t, y=high, mode='lines', line=dict(width=0), fill='tonexty',
+                             fillcolor=f"rgba({rgb}, 0.2)", name=f"{name} 5–95%", legendgroup=name))
+    fig.add_trace(go.Scatter(x=t, y=median, mode='lines', line=dict(color=f"rgb({rgb})"),
+                             name=f"{name} (mediana)", legendgroup=name))
+
+
+def stochastic_figures(t, bands, samples, outbreak_size, name, rgb):
+    """Trayectorias de muestra con su banda y la distribución del tamaño del brote."""
+    fig = go.Figure()
+    for i, path in enumerate(samples):
+        fig.add_trace(go.Scatter(x=t, y=path, mode='lines', line=dict(color="rgba(120, 120, 120, 0.35)", width=1),
+                                 name="Réplicas", legendgroup="samples", showlegend=i == 0, hoverinfo='skip'))
+    add_quantile_band(fig, t, bands, name, rgb)
+    fig.update_layout(title="Simulación estocástica", xaxis_title="Tiempo",
+                      yaxis_title="Población", template="plotly_white")
+
+    sizes = go.Figure(go.Histogram(x=outbreak_size, nbinsx=50, marker_color=f"rgb({rgb})"))
+    sizes.update_layout(title="Tamaño del brote (nuevos contagios)", xaxis_title="Contagios",
+                        yaxis_title="Réplicas", template="plotly_white")
+    return fig, sizes
+
+
+# ------------------------------------------------------------
+#  Nivel de detalle: reducción de trazas largas
+# ------------------------------------------------------------
+# Atributos por punto que se recortan junto con x e y
+_PER_POINT = ('x', 'y', 'text', 'hovertext', 'customdata')
+
+
+def _buckets(edges, size):
+    """Índices de cada grupo ``[edges[i], edges[i+1])`` como matriz rectangular.
+
+    Los grupos difieren en a lo más un punto: las celdas sobrantes repiten el
+    último índice y ``valid`` las marca como False.
+    """
+    lo = edges[:-1]
+    idx = lo[:, None] + np.arange(np.diff(edges).max())
+    valid = idx < edges[1:, None]
+    return np.minimum(idx, size - 1), valid
+
+
+def lttb_indices(x, y, n):
+    """Índices elegidos por Largest-Triangle-Three-Buckets.
+
+    Conserva el primer y el último punto y, de cada uno de los ``n − 2``
+    grupos intermedios, el que forma el triángulo de mayor área con el punto
+    elegido en el grupo anterior y el promedio del grupo siguiente: picos y
+    valles sobreviven. Todos los grupos se evalúan a la vez con NumPy; como
+    el punto del grupo anterior todavía no se conoce, sale de una primera
+    pasada que usa el promedio de ese grupo.
+    """
+    size = len(y)
+    if n >= size or n < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, size - 1, n - 1).astype(np.intp)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:size - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:size - 1], edges[:-1]) / counts
+    # El grupo siguiente del último es el punto final
+    next_x = np.append(avg_x[1:], x[-1])[:, None]
+    next_y = np.append(avg_y[1:], y[-1])[:, None]
+    idx, valid = _buckets(edges, size)
+    bx, by = x[idx], y[idx]
+    rows = np.arange(len(idx))
+
+    def pick(anchor_x, anchor_y):
+        ax, ay = anchor_x[:, None], anchor_y[:, None]
+        area = np.abs((ax - next_x) * (by - ay) - (ax - bx) * (next_y - ay))
+        area[~valid] = -1.0
+        return idx[rows, area.argmax(axis=1)]
+
+    first = pick(np.append(x[0], avg_x[:-1]), np.append(y[0], avg_y[:-1]))
+    chosen = pick(np.append(x[0], x[first[:-1]]), np.append(y[0], y[first[:-1]]))
+    return np.concatenate([[0], chosen, [size - 1]])
+
+
+def minmax_indices(y, n):
+    """Extremos de la serie más mínimo y máximo de ``(n - 2) // 2`` grupos.
+
+    Decimación min/max: nunca devuelve más de ``n`` índices y, con grupos de
+    tamaño parejo, casi siempre los usa todos.
+    """
+    size = len(y)
+    if n >= size:
+        return np.arange(size)
+    if n < 4:
+        return np.unique(np.linspace(0, size - 1, n).astype(np.intp))
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, size, (n - 2) // 2 + 1).astype(np.intp)
+    idx, valid = _buckets(edges, size)
+    values = y[idx]
+    rows = np.arange(len(idx))
+    lows = idx[rows, np.where(valid, values, np.inf).argmin(axis=1)]
+    highs = idx[rows, np.where(valid, values, -np.inf).argmax(axis=1)]
+    return np.unique(np.concatenate([lows, highs, [0, size - 1]]))
+
+
+def _numeric(x, size):
+    """x como float64 si es numérico o de fechas; si no, las posiciones."""
+    if x is None:
+        return np.arange(size, dtype=float)
+    values = np.asarray(x)
+    if values.dtype.kind == 'O':
+        try:
+            values = values.astype('datetime64[ns]')
+        except (TypeError, ValueError):
+            return np.arange(size, dtype=float)
+    if values.dtype.kind == 'M':
+        values = values.astype('datetime64[ns]').astype(np.int64)
+    if values.dtype.kind not in 'iuf':
+        return np.arange(size, dtype=float)
+    return values.astype(float)
+
+
+def _implicit_x(trace, size):
+    """x0 + i·dx de una traza sin x, o None si x0/dx no son números (fechas)."""
+    x0 = 0 if trace.x0 is None else trace.x0
+    dx = 1 if trace.dx is None else trace.dx
+    if not (isinstance(x0, numbers.Real) and isinstance(dx, numbers.Real)):
+        return None
+    return x0 + dx * np.arange(size)
+
+
+def downsample_indices(x, y, budget=LOD_POINTS, method=LOD_METHOD):
+    """Índices a conservar para dibujar (x, y) con a lo más ``budget`` puntos.
+
+    Con x creciente se usa LTTB (o min/max con ``method='minmax'``); las
+    curvas paramétricas, como las trayectorias de fase, se reducen tomando
+    uno de cada k puntos. Devuelve None si la traza ya cabe.
+    """
+    size = len(y)
+    if size <= budget:
+        return None
+    x = _numeric(x, size)
+    y = np.asarray(y, dtype=float)
+    if not np.all(np.diff(x) >= 0):
+        return np.unique(np.linspace(0, size - 1, budget).astype(np.intp))
+    if method == 'minmax':
+        return minmax_indices(y, budget)
+    return lttb_indices(x, y, budget)
+
+
+def downsample_figure(fig, budget=LOD_POINTS, method=LOD_METHOD, webgl_threshold=WEBGL_THRESHOLD):
+    """Reduce cada traza de líneas de ``fig`` a ``budget`` puntos.
+
+    Es la primera etapa de ``prepare_figure``: el tamaño de la respuesta y el tiempo de dibujo en el navegador quedan acotados sin
+    importar el horizonte de la simulación. Las trazas de solo marcadores
+    (campos de direcciones, marcadores de evaluación) no se tocan. Las que
+    siguen teniendo más de ``webgl_threshold`` puntos pasan a Scattergl;
+    por eso hay que usar la figura devuelta.
+    """
+    webgl = False
+    for trace in fig.data:
+        if trace.type not in ('scatter', 'scattergl') or trace.y is None:
+            continue
+        if trace.mode is not None and 'lines' not in trace.mode:
+            continue
+        size = len(trace.y)
+        # Sin x se reduce sobre x0 + i·dx, que pasa a ser x explícito: quitar
+        # solo puntos de y correría los que quedan hacia x0
+        x = trace.x if trace.x is not None else _implicit_x(trace, size)
+        keep = None if x is None else downsample_indices(x, trace.y, budget, method)
+        if keep is not None:
+            updates = {'x': np.asarray(x)[keep]} if trace.x is None else {}
+            for attr in _PER_POINT:
+                value = getattr(trace, attr)
+                if value is not None and not isinstance(value, str) and len(value) == size:
+                    updates[attr] = np.asarray(value)[keep]
+            trace.update(updates)
+        webgl = webgl or (trace.type == 'scatter' and len(trace.y) > webgl_threshold)
+    if not webgl:
+        return fig
+
+    traces = []
+    for trace in fig.data:
+        if trace.type == 'scatter' and trace.y is not None and len(trace.y) > webgl_threshold:
+            props = trace.to_plotly_json()
+            props.pop('type', None)
+            trace = go.Scattergl(props, skip_invalid=True)
+        traces.append(trace)
+    return go.Figure(data=traces, layout=fig.layout)
+
+
+# ------------------------------------------------------------
+#  Zoom: volver a evaluar solo la ventana visible
+# ------------------------------------------------------------
+def axis_range(relayout, axis='xaxis'):
+    """Rango de ``axis`` en un ``relayoutData`` de zoom o pan, o None."""
+    if f'{axis}.range[0]' in relayout:
+        return relayout[f'{axis}.range[0]'], relayout[f'{axis}.range[1]']
+    if f'{axis}.range' in relayout:
+        return tuple(relayout[f'{axis}.range'])
+    return None
+
+
+def zoom_window(relayout, full_range, axis='xaxis'):
+    """Ventana de ``axis`` que hay que volver a evaluar tras un ``relayoutData``.
+
+    Devuelve el rango completo si se restableció el zoom, la parte visible
+    dentro de ``full_range`` tras un zoom o un pan, o None si el evento no
+    cambia ese eje (autosize, zoom solo en y, etc.).
+    """
+    if not relayout:
+        return None
+    if relayout.get(f'{axis}.autorange'):
+        return tuple(full_range)
+    visible = axis_range(relayout, axis)
+    if visible is None:
+        return None
+    lo, hi = max(float(visible[0]), full_range[0]), min(float(visible[1]), full_range[1])
+    return (lo, hi) if hi > lo else None
+
+
+def zoom_grid(window, points=ZOOM_POINTS):
+    """Malla de resolución de pantalla sobre la ventana visible."""
+    return np.linspace(window[0], window[1], points)
+
+
+def zoom_patch(traces):
+    """Patch que reemplaza x e y de las trazas ``{índice: (x, y)}``.
+
+    La carga es siempre de ``ZOOM_POINTS`` puntos por traza, sea cual sea
+    el nivel de zoom; el ``uirevision`` de la figura conserva la vista.
+    """
+    patched = Patch()
+    for index, (x, y) in traces.items():
+        patched['data'][index]['x'] = array_payload(x)
+        patched['data'][index]['y'] = array_payload(y)
+    return patched
+
+
+# ------------------------------------------------------------
+#  Codificación: arreglos tipados en lugar de listas de decimales
+# ------------------------------------------------------------
+# Arreglos más cortos que esto se dejan como listas (la especificación pesa más)
+TYPED_ARRAY_MIN = 16
+
+
+def encode_array(values, float32=FIGURE_FLOAT32):
+    """Arreglo numérico como arreglo tipado de plotly.js (``{'dtype', 'bdata'}``).
+
+    Los bytes van en base64, little-endian. Con ``float32`` los flotantes
+    viajan en precisión simple (la mitad de bytes, ~7 cifras significativas).
+    Los enteros que no caben en int32 pasan a float64. Lo que no es numérico
+    (fechas, texto, listas con None) se devuelve sin cambios.
+    """
+    arr = np.asarray(values)
+    kind = arr.dtype.kind
+    if kind == 'f':
+        dtype = '<f4' if float32 or arr.dtype.itemsize <= 4 else '<f8'
+    elif kind in 'iu':
+        fits = arr.size == 0 or (arr.min() >= -2 ** 31 and arr.max() < 2 ** 31)
+        dtype = '<i4' if fits else '<f8'
+    else:
+        return values
+    data = np.ascontiguousarray(arr, dtype=dtype)
+    spec = {'dtype': dtype[1:], 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+    if data.ndim > 1:
+        spec['shape'] = ', '.join(str(n) for n in data.shape)
+    return spec
+
+
+def decode_array(spec):
+    """Inversa de ``encode_array``: arreglo tipado de plotly.js como ndarray."""
+    data = np.frombuffer(base64.b64decode(spec['bdata']), dtype=np.dtype(spec['dtype']).newbyteorder('<'))
+    if spec.get('shape'):
+        data = data.reshape([int(n) for n in str(spec['shape']).split(',') if n.strip()])
+    return data
+
+
+def _is_typed_array(value):
+    return isinstance(value, dict) and 'bdata' in value and 'dtype' in value
+
+
+def array_payload(values):
+    """``values`` listo para un Patch: arreglo tipado si TYPED_ARRAYS está activo."""
+    if TYPED_ARRAYS and isinstance(values, np.ndarray) and values.size >= TYPED_ARRAY_MIN:
+        return encode_array(values)
+    return values
+
+
+def encode_figure(fig, float32=FIGURE_FLOAT32):
+    """Figura como dict con los arreglos NumPy de las trazas ya codificados.
+
+    Dash serializa el dict tal cual (con orjson si está disponible); las
+    listas de Python, los textos y el layout no se tocan. plotly.py 5 deja
+    los arreglos como ndarray en ``to_plotly_json()``, pero plotly.py >= 6 ya
+    los entrega como arreglos tipados en f8: esos se decodifican y se vuelven
+    a codificar para que ``float32`` también se aplique.
+    """
+    def encode(value):
+        if _is_typed_array(value):
+            value = decode_array(value)
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind in 'fiu' and value.size >= TYPED_ARRAY_MIN:
+                return encode_array(value, float32)
+            return value
+        if isinstance(value, dict):
+            return {key: encode(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [encode(item) for item in value]
+        return value
+
+    figure = fig.to_plotly_json() if hasattr(fig, 'to_plotly_json') else fig
+    return dict(figure, data=encode(figure.get('data', [])))
+
+
+def prepare_figure(fig):
+    """Última etapa de los callbacks que devuelven figuras.
+
+    Reduce el nivel de detalle (``downsample_figure``) y, con TYPED_ARRAYS,
+    codifica los arreglos como arreglos tipados.
+    """
+    fig = downsample_figure(fig)
+    return encode_figure(fig) if TYPED_ARRAYS else fig
@@ -0,0 +1,208 @@
+"""Soluciones cerradas de los modelos de crecimiento (páginas 03–06).
+
+Cada función recibe parámetros escalares o arreglos 1-D (uno por conjunto de
+parámetros) y un vector de tiempos, y devuelve una matriz de forma
+(n_parametros, n_tiempos). Así se evalúan miles de curvas en una sola pasada
+de NumPy, tanto desde las páginas como desde barridos, ajustes o APIs.
+"""
+import numpy as np
+
+
+def _broadcast_params(*params):
+    # Cada parámetro pasa a ser una columna (n, 1) para cruzarse con los tiempos
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(p, dtype=float)) for p in params])
+    return [a.reshape(-1, 1) for a in arrays]
+
+
+def _times(t):
+    # Un vector (m,) se comparte entre todas las curvas; una matriz (n, m)
+    # permite una malla de tiempos distinta por conjunto de parámetros
+    t = np.asarray(t, dtype=float)
+    return t.reshape(1, -1) if t.ndim <= 1 else t
+
+
+def exponential(p0, r, t):
+    """P(t) = P₀·e^{rt}"""
+    p0, r = _broadcast_params(p0, r)
+    with np.errstate(over='ignore'):
+        return p0 * np.exp(r * _times(t))
+
+
+def logistic(p0, r, k, t):
+    """P(t) = K / (1 + ((K − P₀)/P₀)·e^{−rt})"""
+    p0, r, k = _broadcast_params(p0, r, k)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        return k * p0 / (p0 + (k - p0) * np.exp(-r * _times(t)))
+
+
+def gompertz(p0, k, r, t):
+    """P(t) = K·exp(−ln(K/P₀)·e^{−rt})"""
+    p0, k, r = _broadcast_params(p0, k, r)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        return k * np.exp(-np.log(k / p0) * np.exp(-r * _times(t)))
+
+
+def richards(p0, k, r, nu, t):
+    """P(t) = K / (1 + ((K/P₀)^ν − 1)·e^{−rνt})^{1/ν}
+
+    Para ν extremos el resultado puede contener inf o nan; quien llama
+    decide cómo reportarlo (ver ``np.isfinite``).
+    """
+    p0, k, r, nu = _broadcast_params(p0, k, r, nu)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        ratio = (k / p0) ** nu
+        return k / (1 + (ratio - 1) * np.exp(-r * nu * _times(t))) ** (1 / nu)
+
+
+GROWTH_MODELS = {
+    'exponential': exponential,
+    'logistic': logistic,
+    'gompertz': gompertz,
+    'richards': richards,
+}
+
+
+def evaluate(model, t, **params):
+    """Evalúa un modelo por nombre, p. ej. ``evaluate('logistic', t, p0=..., r=..., k=...)``."""
+    try:
+        func = GROWTH_MODELS[model]
+    except KeyError:
+        raise ValueError(f"Modelo desconocido: {model!r}") from None
+    return func(t=t, **params)
+
+
+# ------------------------------------------------------------
+#  Logístico con tasa variable (página 08)
+# ------------------------------------------------------------
+def sinusoidal_rate(r0, alpha, omega, t):
+    """r(t) = r₀·(1 + α·sin(ωt))"""
+    r0, alpha, omega = _broadcast_params(r0, alpha, omega)
+    return r0 * (1 + alpha * np.sin(omega * _times(t)))
+
+
+def integrated_sinusoidal_rate(r0, alpha, omega, t):
+    """∫₀ᵗ r(s) ds = r₀·(t + α·(1 − cos ωt)/ω), con límite r₀·t cuando ω = 0."""
+    r0, alpha, omega = _broadcast_params(r0, alpha, omega)
+    t = _times(t)
+    num = 1 - np.cos(omega * t)
+    omega = np.broadcast_to(omega, num.shape)
+    oscillation = np.divide(num, omega, out=np.zeros_like(num), where=omega != 0)
+    return r0 * (t + alpha * oscillation)
+
+
+def integrated_rate(rate, t):
+    """Integral acumulada de una r(t) arbitraria desde t[0] (Simpson por intervalo).
+
+    ``rate`` es un callable vectorizado; se evalúa una vez en la malla y una
+    vez en los puntos medios, sin bucles de Python.
+    """
+    t = _times(t)
+    mid = 0.5 * (t[..., 1:] + t[..., :-1])
+    f = np.broadcast_to(np.asarray(rate(t), dtype=float), t.shape)
+    f_mid = np.broadcast_to(np.asarray(rate(mid), dtype=float), mid.shape)
+    pieces = np.diff(t, axis=-1) / 6 * (f[..., :-1] + 4 * f_mid + f[..., 1:])
+    start = np.zeros(pieces.shape[:-1] + (1,))
+    return np.concatenate([start, np.cumsum(pieces, axis=-1)], axis=-1)
+
+
+def variable_logistic(p0, k, t, r0=0.0, alpha=0.0, omega=0.0, rate=None):
+    """Solución de dP/dt = r(t)·P·(1 − P/K).
+
+    Con R(t) = ∫ r, la solución es P = K·P₀ / (P₀ + (K − P₀)·e^{−R(t)}).
+    Sin ``rate`` se usa la integral exacta de r₀·(1 + α·sin ωt); con un
+    ``rate`` propio se usa la cuadratura acumulada de ``integrated_rate``,
+    que toma t[..., 0] como instante inicial (requiere al menos dos tiempos).
+    """
+    if rate is None:
+        big_r = integrated_sinusoidal_rate(r0, alpha, omega, t)
+    else:
+        big_r = integrated_rate(rate, t)
+    p0, k = _broadcast_params(p0, k)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        return k * p0 / (p0 + (k - p0) * np.exp(-big_r))
+
+
+# ------------------------------------------------------------
+#  Logístico con migración constante (página 09)
+# ------------------------------------------------------------
+def _migration_roots(p0, r, k, m):
+    # dP/dt = −a·P² + r·P + M con a = r/K (ecuación de Riccati). Con r = 0
+    # las raíces no existen (a = 0): quien llama usa P₀ + M·t en ese caso.
+    if np.any(r < 0):
+        raise ValueError("El modelo logístico con migración requiere r ≥ 0")
+    with np.errstate(all='ignore'):
+        a = r / k
+        disc = r ** 2 + 4 * a * m
+        s = np.sqrt(np.abs(disc))
+        p_plus = (r + s) / (2 * a)
+        p_minus = (r - s) / (2 * a)
+        p_star = k / 2
+        q = s / (2 * a)
+    return a, disc, s, p_plus, p_minus, p_star, q
+
+
+def migration_extinction_time(p0, r, k, m):
+    """Instante en que P llega a 0 (inf si la población nunca se extingue)."""
+    p0, r, k, m = _broadcast_params(p0, r, k, m)
+    a, disc, s, p_plus, p_minus, p_star, q = _migration_roots(p0, r, k, m)
+    with np.errstate(all='ignore'):
+        # Dos equilibrios: se extingue si arranca por debajo del inestable P₋
+        t_two = np.where(
+            p0 < p_minus,
+            -np.log(p_plus * (p_minus - p0) / (p_minus * (p_plus - p0))) / s,
+            np.inf,
+        )
+        # Raíz doble P* = K/2
+        t_double = np.where(p0 < p_star, p0 / (a * p_star * (p_star - p0)), np.inf)
+        # Sin equilibrios: siempre decrece hasta extinguirse
+        t_none = (np.arctan((p0 - p_star) / q) - np.arctan(-p_star / q)) / (a * q)
+        t_ext = np.where(disc > 0, t_two, np.where(disc < 0, t_none, t_double))
+        # r = 0: P₀ + M·t llega a 0 solo si M < 0
+        t_linear = np.where(m < 0, -p0 / m, np.inf)
+        t_ext = np.where(r == 0, t_linear, t_ext)
+    return t_ext.ravel()
+
+
+def logistic_migration(p0, r, k, m, t):
+    """Solución exacta de dP/dt = rP(1 − P/K) + M, con P absorbido en 0.
+
+    Se resuelve como ecuación de Riccati según el signo del discriminante
+    r² + 4rM/K, así que el costo no depende de t ni de ningún paso dt. Con
+    r = 0 la solución es P₀ + M·t; r < 0 es un ``ValueError``.
+    """
+    t_ext = migration_extinction_time(p0, r, k, m).reshape(-1, 1)
+    p0, r, k, m = _broadcast_params(p0, r, k, m)
+    a, disc, s, p_plus, p_minus, p_star, q = _migration_roots(p0, r, k, m)
+    t = _times(t)
+    with np.errstate(all='ignore'):
+        decay = np.exp(-s * t)
+        two_roots = ((p_plus * (p0 - p_minus) - p_minus * (p0 - p_plus) * decay)
+                     / ((p0 - p_minus) - (p0 - p_plus) * decay))
+        double_root = p_star + (p0 - p_star) / (1 + a * (p0 - p_star) * t)
+        no_roots = p_star + q * np.tan(np.arctan((p0 - p_star) / q) - a * q * t)
+        P = np.where(disc > 0, two_roots, np.where(disc < 0, no_roots, double_root))
+        P = np.where(r == 0, p0 + m * t, P)
+    return np.where(t >= t_ext, 0.0, np.maximum(P, 0.0))
+
+
+def logistic_migration_adaptive(p0, r, k, m, t, rtol=1e-8, atol=1e-8):
+    """Integración numérica con control de paso adaptativo (RK45).
+
+    Todos los conjuntos de parámetros se integran juntos como un solo
+    sistema vectorizado. La memoria depende solo de ``t`` (la resolución de
+    salida que pide quien llama), no del horizonte de integración.
+    """
+    from scipy.integrate import solve_ivp
+
+    p0, r, k, m = (c.ravel() for c in _broadcast_params(p0, r, k, m))
+    t = np.asarray(t, dtype=float).ravel()
+
+    def rhs(_, P):
+        dP = r * P * (1 - P / k) + m
+        # Barrera absorbente en P = 0
+        return np.where((P <= 0) & (dP < 0), 0.0, dP)
+
+    sol = solve_ivp(rhs, (t[0], t[-1]), p0, t_eval=t, method='RK45', rtol=rtol, atol=atol)
+    if not sol.success:
+        raise RuntimeError(sol.message)
+    return np.maximum(sol.y, 0.0)
@@ -0,0 +1,104 @@
+"""Cliente HTTP compartido para las páginas que consultan servicios externos.
+
+Una sola ``requests.Session`` por proceso reutiliza las conexiones
+(keep-alive) y limita cuántas se abren por host. Todas las peticiones llevan
+timeout de conexión y de lectura, y los errores transitorios se reintentan
+unas pocas veces con backoff exponencial. ``RateLimiter`` espacia las
+peticiones a un servicio entre todos los procesos de la app.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    HTTP_BACKOFF, HTTP_CONNECT_TIMEOUT, HTTP_POOL_MAXSIZE, HTTP_READ_TIMEOUT, HTTP_RETRIES,
+)
+
+__all__ = ['get', 'get_session', 'RateLimiter', 'RequestException']
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+    )
+    # pool_block: si un host ya tiene HTTP_POOL_MAXSIZE conexiones ocupadas,
+    # la petición espera en vez de abrir más
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_MAXSIZE,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    # Una sesión por proceso: los sockets no deben heredarse tras un fork
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        with _lock:
+            session = _sessions.get(pid)
+            if session is None:
+                session = _sessions[pid] = _build_session()
+    return session
+
+
+def get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+class RateLimiter:
+    """Como mucho una petición cada ``interval`` segundos, entre procesos.
+
+    El próximo turno libre se guarda en SQLite, así que lo comparten los
+    workers de gunicorn y los procesos de los background callbacks.
+    ``wait()`` reserva el turno siguiente y duerme hasta que llega.
+    """
+
+    def __init__(self, path, name, interval):
+        self.path = path
+        self.name = name
+        self.interval = interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _reserve(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, next REAL)")
+            # BEGIN IMMEDIATE: un solo proceso a la vez lee y mueve el turno
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT next FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+            slot = max(time.time(), row[0] if row else 0.0)
+            conn.execute("INSERT OR REPLACE INTO rate_limits VALUES (?, ?)", (self.name, slot + self.interval))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return slot
+
+    def wait(self):
+        if self.interval <= 0:
+            return
+        delay = self._reserve() - time.time()
+        if delay > 0:
+            time.sleep(delay)
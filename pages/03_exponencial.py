@@ -1,9 +1,13 @@
 import dash 
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback, clientside_callback, ClientsideFunction
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from config import CLIENTSIDE_CALLBACKS
+from figures import evaluation_patch, prepare_figure, zoom_grid, zoom_patch, zoom_window
+from growth import exponential
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo Exponencial')
 
@@ -19,15 +23,21 @@ page_content = dbc.Card(
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Ecuación Diferencial", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?\frac{dP}{dt}=rP", 
-                             style={'height': '50px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        \frac{dP}{dt}=rP
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Solución de la E.D.O.", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?P(t)=P_0e^{rt}", 
-                             style={'height': '50px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        P(t)=P_0e^{rt}
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
         ]),
@@ -94,37 +104,57 @@ page_content = dbc.Card(
     className="m-4",
 )
 
+def base_figure():
+    fig = go.Figure()
+
+    fig.update_layout(
+        title_text="Crecimiento Exponencial: dP/dt = rP",
+        title_x=0.5,
+        xaxis_title="Tiempo (t)",
+        yaxis_title="Población (P)",
+        template="plotly_white",
+        height=550,
+        font=dict(family="Outfit, sans-serif"),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=40, r=20, t=60, b=40),
+        plot_bgcolor='lightblue'
+    )
+
+    fig.update_xaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
+    fig.update_yaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
+
+    return fig
+
 layout = html.Div([
-    html.Link(
-        rel='stylesheet',
-        href='https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap'
-    ),
     html.Div(
         page_content,
         style={'fontFamily': 'Outfit, sans-serif'}
-    )
+    ),
+    dcc.Store(id='exp-base-figure', data=base_figure().to_plotly_json())
 ])
 
-@callback(
-    [Output('exponential-graph', 'figure'),
-     Output('exp-pop-result', 'children')],
-    [Input('exp-initial-pop-input', 'value'),
-     Input('exp-rate-input', 'value'),
-     Input('exp-time-max-input', 'value'),
-     Input('exp-time-input', 'value')]
-)
+@cached_model('exponential')
+def exponential_curve(p0, r, t_max):
+    t = np.linspace(0, t_max, 200)
+    return t, exponential(p0, r, t)[0]
+
 def update_exponential_graph(p0, r, t_max, t_eval):
     if p0 is None or r is None or t_max is None or t_eval is None:
         return dash.no_update, ""
 
     t_eval = min(t_eval, t_max)
 
-    t = np.linspace(0, t_max, 200)
-    P = p0 * np.exp(r * t)
+    t, P = exponential_curve(p0, r, t_max)
 
-    P_eval = p0 * np.exp(r * t_eval)
+    P_eval = exponential(p0, r, t_eval)[0, 0]
 
-    fig = go.Figure()
+    fig = base_figure()
 
     fig.add_trace(go.Scatter(
         x=t, y=P, mode='lines',
@@ -141,26 +171,67 @@ def update_exponential_graph(p0, r, t_max, t_eval):
         name='Evaluación'
     ))
 
-    fig.update_layout(
-        title_text="Crecimiento Exponencial: dP/dt = rP",
-        title_x=0.5,
-        xaxis_title="Tiempo (t)",
-        yaxis_title="Población (P)",
-        template="plotly_white",
-        height=550,
-        font=dict(family="Outfit, sans-serif"),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        margin=dict(l=40, r=20, t=60, b=40),
-        plot_bgcolor='lightblue'
-    )
+    fig.update_xaxes(range=[0, t_max])
+    # El zoom del usuario se conserva mientras no cambie tₘₐₓ
+    fig.update_layout(uirevision=t_max)
 
-    fig.update_xaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray', range=[0, t_max])
-    fig.update_yaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
+    return prepare_figure(fig), f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+def update_exponential_marker(t_eval, p0, r, t_max):
+    if p0 is None or r is None or t_max is None or t_eval is None:
+        return dash.no_update, ""
+
+    t_eval = min(t_eval, t_max)
+    P_eval = exponential(p0, r, t_eval)[0, 0]
+
+    return evaluation_patch(1, t_eval, P_eval), f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+def zoom_exponential(relayout, p0, r, t_max):
+    if None in (p0, r, t_max):
+        return dash.no_update
+    window = zoom_window(relayout, (0, t_max))
+    if window is None:
+        return dash.no_update
+    t = zoom_grid(window)
+    return zoom_patch({0: (t, exponential(p0, r, t)[0])})
+
+outputs = [Output('exponential-graph', 'figure'),
+           Output('exp-pop-result', 'children')]
+param_inputs = [Input('exp-initial-pop-input', 'value'),
+                Input('exp-rate-input', 'value'),
+                Input('exp-time-max-input', 'value')]
+time_input = Input('exp-time-input', 'value')
+time_state = State('exp-time-input', 'value')
+param_states = [State(i.component_id, i.component_property) for i in param_inputs]
+zoom_output = Output('exponential-graph', 'figure', allow_duplicate=True)
+zoom_input = Input('exponential-graph', 'relayoutData')
+marker_outputs = [Output('exponential-graph', 'figure', allow_duplicate=True),
+                  Output('exp-pop-result', 'children', allow_duplicate=True)]
+
+if CLIENTSIDE_CALLBACKS:
+    # Los parámetros redibujan la curva; "Tiempo a Evaluar" solo mueve el marcador
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='exponential'),
+        outputs, param_inputs, [time_state, State('exp-base-figure', 'data')]
+    )
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='exponentialMarker'),
+        marker_outputs, time_input, param_states + [State('exponential-graph', 'figure')],
+        prevent_initial_call=True
+    )
+    # Zoom: la ventana visible se vuelve a evaluar en el navegador
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='exponentialZoom'),
+        zoom_output, zoom_input, param_states + [State('exponential-graph', 'figure')],
+        prevent_initial_call=True
+    )
+else:
+    # Los parámetros redibujan la curva; "Tiempo a Evaluar" solo mueve el marcador
+    callback(outputs, param_inputs, time_state)(update_exponential_graph)
+    callback(marker_outputs, time_input, param_states, prevent_initial_call=True)(update_exponential_marker)
+    callback(zoom_output, zoom_input, param_states, prevent_initial_call=True)(zoom_exponential)
 
-    return fig, f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
\ No newline at end of file
+def warm_up(values):
+    """Curva inicial en caché (warmup.py); con CLIENTSIDE_CALLBACKS la dibuja el navegador."""
+    if not CLIENTSIDE_CALLBACKS:
+        exponential_curve(*(values[i.component_id] for i in param_inputs))
@@ -1,9 +1,13 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback, clientside_callback, ClientsideFunction
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from config import CLIENTSIDE_CALLBACKS
+from figures import evaluation_patch, prepare_figure, zoom_grid, zoom_patch, zoom_window
+from growth import logistic
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo Logístico')
 
@@ -20,15 +24,21 @@ page_content = dbc.Card(
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Ecuación Diferencial", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?\frac{dP}{dt}=rP(1-\frac{P}{K})", 
-                             style={'height': '50px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        \frac{dP}{dt}=rP(1-\frac{P}{K})
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Solución de la E.D.O.", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?P(t)=\frac{K}{1+\left(\frac{K-P_0}{P_0}\right)e^{-rt}}", 
-                             style={'height': '60px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        P(t)=\frac{K}{1+\left(\frac{K-P_0}{P_0}\right)e^{-rt}}
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
         ]),
@@ -105,26 +115,46 @@ page_content = dbc.Card(
     className="m-4",
 )
 
+def base_figure():
+    fig = go.Figure()
+
+    fig.update_layout(
+        title_text="Crecimiento Logístico: dP/dt = rP(1 - P/K)",
+        title_x=0.5,
+        xaxis_title="Tiempo (t)",
+        yaxis_title="Población (P)",
+        template="plotly_white",
+        height=550,
+        font=dict(family="Outfit, sans-serif"),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=40, r=20, t=60, b=40),
+        plot_bgcolor='lightblue'
+    )
+
+    fig.update_xaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
+    fig.update_yaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
+
+    return fig
+
 layout = html.Div([
-    html.Link(
-        rel='stylesheet',
-        href='https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap'
-    ),
     html.Div(
         page_content,
         style={'fontFamily': 'Outfit, sans-serif'}
-    )
+    ),
+    dcc.Store(id='log-base-figure', data=base_figure().to_plotly_json())
 ])
 
-@callback(
-    [Output('logistic-graph', 'figure'),
-     Output('log-pop-result', 'children')],
-    [Input('log-initial-pop-input', 'value'),
-     Input('log-rate-input', 'value'),
-     Input('log-capacity-input', 'value'),
-     Input('log-time-max-input', 'value'),
-     Input('log-time-input', 'value')]
-)
+@cached_model('logistic')
+def logistic_curve(p0, r, k, t_max):
+    t = np.linspace(0, t_max, 400)
+    return t, logistic(p0, r, k, t)[0]
+
 def update_logistic_graph(p0, r, k, t_max, t_eval):
     if p0 is None or r is None or k is None or t_max is None or t_eval is None:
         return dash.no_update, ""
@@ -134,11 +164,10 @@ def update_logistic_graph(p0, r, k, t_max, t_eval):
 
     t_eval = min(t_eval, t_max)
 
-    t = np.linspace(0, t_max, 400)
-    P = k / (1 + ((k - p0) / p0) * np.exp(-r * t))
-    P_eval = k / (1 + ((k - p0) / p0) * np.exp(-r * t_eval))
+    t, P = logistic_curve(p0, r, k, t_max)
+    P_eval = logistic(p0, r, k, t_eval)[0, 0]
 
-    fig = go.Figure()
+    fig = base_figure()
 
     fig.add_trace(go.Scatter(
         x=t, y=P, mode='lines',
@@ -162,26 +191,73 @@ def update_logistic_graph(p0, r, k, t_max, t_eval):
         name='Evaluación'
     ))
 
-    fig.update_layout(
-        title_text="Crecimiento Logístico: dP/dt = rP(1 - P/K)",
-        title_x=0.5,
-        xaxis_title="Tiempo (t)",
-        yaxis_title="Población (P)",
-        template="plotly_white",
-        height=550,
-        font=dict(family="Outfit, sans-serif"),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        margin=dict(l=40, r=20, t=60, b=40),
-        plot_bgcolor='lightblue'
-    )
+    fig.update_xaxes(range=[0, t_max])
+    # El zoom del usuario se conserva mientras no cambie tₘₐₓ
+    fig.update_layout(uirevision=t_max)
 
-    fig.update_xaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray', range=[0, t_max])
-    fig.update_yaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
+    return prepare_figure(fig), f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+def update_logistic_marker(t_eval, p0, r, k, t_max):
+    if p0 is None or r is None or k is None or t_max is None or t_eval is None:
+        return dash.no_update, ""
+
+    if p0 >= k:
+        p0 = k / 2
+
+    t_eval = min(t_eval, t_max)
+    P_eval = logistic(p0, r, k, t_eval)[0, 0]
+
+    return evaluation_patch(2, t_eval, P_eval), f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+def zoom_logistic(relayout, p0, r, k, t_max):
+    if None in (p0, r, k, t_max):
+        return dash.no_update
+    if p0 >= k:
+        p0 = k / 2
+    window = zoom_window(relayout, (0, t_max))
+    if window is None:
+        return dash.no_update
+    t = zoom_grid(window)
+    return zoom_patch({0: (t, logistic(p0, r, k, t)[0])})
+
+outputs = [Output('logistic-graph', 'figure'),
+           Output('log-pop-result', 'children')]
+param_inputs = [Input('log-initial-pop-input', 'value'),
+                Input('log-rate-input', 'value'),
+                Input('log-capacity-input', 'value'),
+                Input('log-time-max-input', 'value')]
+time_input = Input('log-time-input', 'value')
+time_state = State('log-time-input', 'value')
+param_states = [State(i.component_id, i.component_property) for i in param_inputs]
+zoom_output = Output('logistic-graph', 'figure', allow_duplicate=True)
+zoom_input = Input('logistic-graph', 'relayoutData')
+marker_outputs = [Output('logistic-graph', 'figure', allow_duplicate=True),
+                  Output('log-pop-result', 'children', allow_duplicate=True)]
+
+if CLIENTSIDE_CALLBACKS:
+    # Los parámetros redibujan la curva; "Tiempo a Evaluar" solo mueve el marcador
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='logistic'),
+        outputs, param_inputs, [time_state, State('log-base-figure', 'data')]
+    )
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='logisticMarker'),
+        marker_outputs, time_input, param_states + [State('logistic-graph', 'figure')],
+        prevent_initial_call=True
+    )
+    # Zoom: la ventana visible se vuelve a evaluar en el navegador
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='logisticZoom'),
+        zoom_output, zoom_input, param_states + [State('logistic-graph', 'figure')],
+        prevent_initial_call=True
+    )
+else:
+    # Los parámetros redibujan la curva; "Tiempo a Evaluar" solo mueve el marcador
+    callback(outputs, param_inputs, time_state)(update_logistic_graph)
+    callback(marker_outputs, time_input, param_states, prevent_initial_call=True)(update_logistic_marker)
+    callback(zoom_output, zoom_input, param_states, prevent_initial_call=True)(zoom_logistic)
 
-    return fig, f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+def warm_up(values):
+    """Curva inicial en caché (warmup.py); con CLIENTSIDE_CALLBACKS la dibuja el navegador."""
+    if not CLIENTSIDE_CALLBACKS:
+        logistic_curve(*(values[i.component_id] for i in param_inputs))
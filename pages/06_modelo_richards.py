@@ -1,9 +1,13 @@
 import dash 
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback, clientside_callback, ClientsideFunction
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from config import CLIENTSIDE_CALLBACKS
+from figures import evaluation_patch, prepare_figure, zoom_grid, zoom_patch, zoom_window
+from growth import richards
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo de Richards')
 
@@ -19,15 +23,21 @@ page_content = dbc.Card(
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Ecuación Diferencial", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?\frac{dP}{dt}=rP\left[1-\left(\frac{P}{K}\right)^\nu\right]", 
-                             style={'height': '50px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        \frac{dP}{dt}=rP\left[1-\left(\frac{P}{K}\right)^\nu\right]
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Solución de la E.D.O.", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?P(t)=\frac{K}{\left[1+\left(\left(\frac{K}{P_0}\right)^\nu-1\right)e^{-r\nu t}\right]^{1/\nu}}", 
-                             style={'height': '70px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        P(t)=\frac{K}{\left[1+\left(\left(\frac{K}{P_0}\right)^\nu-1\right)e^{-r\nu t}\right]^{1/\nu}}
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
         ]),
@@ -107,27 +117,46 @@ page_content = dbc.Card(
     className="m-4",
 )
 
+def base_figure():
+    fig = go.Figure()
+
+    fig.update_layout(
+        title_text="Crecimiento de Richards: dP/dt = rP[1 - (P/K)^ν]",
+        title_x=0.5,
+        xaxis_title="Tiempo (t)",
+        yaxis_title="Población (P)",
+        template="plotly_white",
+        height=550,
+        font=dict(family="Outfit, sans-serif"),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=40, r=20, t=60, b=40),
+        plot_bgcolor='lavender'
+    )
+
+    fig.update_xaxes(showline=True, linewidth=2, linecolor='black', gridcolor='lightgray')
+    fig.update_yaxes(showline=True, linewidth=2, linecolor='black', gridcolor='lightgray')
+
+    return fig
+
 layout = html.Div([
-    html.Link(
-        rel='stylesheet',
-        href='https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap'
-    ),
     html.Div(
         page_content,
         style={'fontFamily': 'Outfit, sans-serif'}
-    )
+    ),
+    dcc.Store(id='richards-base-figure', data=base_figure().to_plotly_json())
 ])
 
-@callback(
-    [Output('richards-graph', 'figure'),
-     Output('richards-pop-result', 'children')],
-    [Input('richards-initial-pop-input', 'value'),
-     Input('richards-k-input', 'value'),
-     Input('richards-rate-input', 'value'),
-     Input('richards-nu-input', 'value'),
-     Input('richards-time-max-input', 'value'),
-     Input('richards-time-input', 'value')]
-)
+@cached_model('richards')
+def richards_curve(p0, k, r, nu, t_max):
+    t = np.linspace(0, t_max, 400)
+    return t, richards(p0, k, r, nu, t)[0]
+
 def update_richards_graph(p0, k, r, nu, t_max, t_eval):
     if None in (p0, k, r, nu, t_max, t_eval):
         return dash.no_update, ""
@@ -139,19 +168,13 @@ def update_richards_graph(p0, k, r, nu, t_max, t_eval):
 
     t_eval = min(t_eval, t_max)
 
-    t = np.linspace(0, t_max, 400)
-    
-    try:
-        ratio = (k / p0) ** nu
-        exponent = -r * nu * t
-        denominator = (1 + (ratio - 1) * np.exp(exponent)) ** (1 / nu)
-        P = k / denominator
-
-        P_eval = k / ((1 + ((k / p0) ** nu - 1) * np.exp(-r * nu * t_eval)) ** (1 / nu))
-    except (OverflowError, ZeroDivisionError, ValueError):
+    t, P = richards_curve(p0, k, r, nu, t_max)
+    P_eval = richards(p0, k, r, nu, t_eval)[0, 0]
+
+    if not (np.all(np.isfinite(P)) and np.isfinite(P_eval)):
         return dash.no_update, "⚠️ Error numérico: ajusta los parámetros (ν muy pequeño o r muy grande)"
 
-    fig = go.Figure()
+    fig = base_figure()
 
     fig.add_trace(go.Scatter(
         x=t, y=P, mode='lines',
@@ -171,26 +194,80 @@ def update_richards_graph(p0, k, r, nu, t_max, t_eval):
     fig.add_hline(y=k, line_dash="dot", line_color="gray", annotation_text="K (capacidad)", 
                   annotation_position="bottom right")
 
-    fig.update_layout(
-        title_text="Crecimiento de Richards: dP/dt = rP[1 - (P/K)^ν]",
-        title_x=0.5,
-        xaxis_title="Tiempo (t)",
-        yaxis_title="Población (P)",
-        template="plotly_white",
-        height=550,
-        font=dict(family="Outfit, sans-serif"),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        margin=dict(l=40, r=20, t=60, b=40),
-        plot_bgcolor='lavender'
-    )
+    fig.update_xaxes(range=[0, t_max])
+    # El zoom del usuario se conserva mientras no cambie tₘₐₓ
+    fig.update_layout(uirevision=t_max)
 
-    fig.update_xaxes(showline=True, linewidth=2, linecolor='black', gridcolor='lightgray', range=[0, t_max])
-    fig.update_yaxes(showline=True, linewidth=2, linecolor='black', gridcolor='lightgray')
+    return prepare_figure(fig), f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+def update_richards_marker(t_eval, p0, k, r, nu, t_max):
+    if None in (p0, k, r, nu, t_max, t_eval):
+        return dash.no_update, ""
+
+    if p0 <= 0 or k <= 0 or p0 >= k:
+        return dash.no_update, "⚠️ Asegúrate de que 0 < P₀ < K"
+    if nu <= 0:
+        return dash.no_update, "⚠️ ν debe ser > 0"
+
+    t_eval = min(t_eval, t_max)
+    P_eval = richards(p0, k, r, nu, t_eval)[0, 0]
+
+    if not np.isfinite(P_eval):
+        return dash.no_update, "⚠️ Error numérico: ajusta los parámetros (ν muy pequeño o r muy grande)"
+
+    return evaluation_patch(1, t_eval, P_eval), f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+def zoom_richards(relayout, p0, k, r, nu, t_max):
+    if None in (p0, k, r, nu, t_max) or p0 <= 0 or k <= 0 or p0 >= k or nu <= 0:
+        return dash.no_update
+    window = zoom_window(relayout, (0, t_max))
+    if window is None:
+        return dash.no_update
+    t = zoom_grid(window)
+    P = richards(p0, k, r, nu, t)[0]
+    if not np.all(np.isfinite(P)):
+        return dash.no_update
+    return zoom_patch({0: (t, P)})
+
+outputs = [Output('richards-graph', 'figure'),
+           Output('richards-pop-result', 'children')]
+param_inputs = [Input('richards-initial-pop-input', 'value'),
+                Input('richards-k-input', 'value'),
+                Input('richards-rate-input', 'value'),
+                Input('richards-nu-input', 'value'),
+                Input('richards-time-max-input', 'value')]
+time_input = Input('richards-time-input', 'value')
+time_state = State('richards-time-input', 'value')
+param_states = [State(i.component_id, i.component_property) for i in param_inputs]
+zoom_output = Output('richards-graph', 'figure', allow_duplicate=True)
+zoom_input = Input('richards-graph', 'relayoutData')
+marker_outputs = [Output('richards-graph', 'figure', allow_duplicate=True),
+                  Output('richards-pop-result', 'children', allow_duplicate=True)]
+
+if CLIENTSIDE_CALLBACKS:
+    # Los parámetros redibujan la curva; "Tiempo a Evaluar" solo mueve el marcador
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='richards'),
+        outputs, param_inputs, [time_state, State('richards-base-figure', 'data')]
+    )
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='richardsMarker'),
+        marker_outputs, time_input, param_states + [State('richards-graph', 'figure')],
+        prevent_initial_call=True
+    )
+    # Zoom: la ventana visible se vuelve a evaluar en el navegador
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='richardsZoom'),
+        zoom_output, zoom_input, param_states + [State('richards-graph', 'figure')],
+        prevent_initial_call=True
+    )
+else:
+    # Los parámetros redibujan la curva; "Tiempo a Evaluar" solo mueve el marcador
+    callback(outputs, param_inputs, time_state)(update_richards_graph)
+    callback(marker_outputs, time_input, param_states, prevent_initial_call=True)(update_richards_marker)
+    callback(zoom_output, zoom_input, param_states, prevent_initial_call=True)(zoom_richards)
 
-    return fig, f" Población en t = {t_eval}: P(t) = {P_eval:.2f}"
\ No newline at end of file
+def warm_up(values):
+    """Curva inicial en caché (warmup.py); con CLIENTSIDE_CALLBACKS la dibuja el navegador."""
+    if not CLIENTSIDE_CALLBACKS:
+        richards_curve(*(values[i.component_id] for i in param_inputs))
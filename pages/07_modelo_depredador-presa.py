@@ -1,13 +1,27 @@
 import dash 
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, Patch, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import solve_ivp
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from figures import array_payload, axis_range, prepare_figure, zoom_grid, zoom_patch, zoom_window
+from predprey import (
+    equilibria, invariant_error, rk45_solution, snap_viewport, solve_symplectic, vector_field,
+)
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo Presa–Depredador')
 
+# Resolución de salida: unos 60 puntos por ciclo, con un mínimo y un tope
+POINTS_PER_CYCLE = 60
+MIN_POINTS = 500
+MAX_POINTS = 20_000
+
+# Orden de las trazas del diagrama de fase (los Patch del campo las usan)
+FIELD_TRACE = 0
+X_NULLCLINE_TRACE = 1
+Y_NULLCLINE_TRACE = 2
+
 page_content = dbc.Card(
     dbc.CardBody([
         html.H2("Modelo Presa–Depredador (Lotka-Volterra)", className="card-title text-center mb-4"),
@@ -20,10 +34,11 @@ page_content = dbc.Card(
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Ecuaciones Diferenciales", className="card-title text-center"),
                 html.Div(
-                    html.Img(
-                        src=r"https://latex.codecogs.com/svg.latex?\begin{cases}\frac{dx}{dt}=\alpha x-\beta xy\\\frac{dy}{dt}=\delta xy-\gamma y\end{cases}",
-                        style={'height': '70px', 'display': 'block', 'margin': '10px auto'}
-                    ),
+                    dcc.Markdown(r"""
+                        $$
+                        \begin{cases}\frac{dx}{dt}=\alpha x-\beta xy\\\frac{dy}{dt}=\delta xy-\gamma y\end{cases}
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
             dbc.Col(dbc.Card(dbc.CardBody([
@@ -100,8 +115,23 @@ page_content = dbc.Card(
                 
                 dbc.Label("Tiempo Final (tₘₐₓ):", className="small"),
                 dcc.Input(id='predprey-time-max-input', type='number', value=15, min=1, step=0.5,
+                          style=INPUT_STYLE_COMPACT, className="mb-2"),
+
+                dbc.Label("Integrador:", className="small"),
+                dcc.Dropdown(
+                    id='predprey-method-input',
+                    options=[
+                        {'label': 'Simpléctico (conserva V)', 'value': 'symplectic'},
+                        {'label': 'RK45 (propósito general)', 'value': 'rk45'},
+                    ],
+                    value='symplectic', clearable=False, className="mb-2"
+                ),
+
+                dbc.Label("Campo de direcciones (celdas por lado):", className="small"),
+                dcc.Input(id='predprey-field-resolution', type='number', value=25, min=5, max=100, step=1,
                           style=INPUT_STYLE_COMPACT, className="mb-3"),
-                
+                dcc.Store(id='predprey-phase-viewport'),
+
                 html.Div(id='predprey-result', className="text-center fw-bold mt-3 text-primary"),
             ], md=3),
             dbc.Col([
@@ -111,6 +141,9 @@ page_content = dbc.Card(
                     ]),
                     dcc.Tab(label='Fase (Presas vs Depredadores)', children=[
                         dcc.Graph(id='predprey-phase-graph', style={'height': '100%'})
+                    ]),
+                    dcc.Tab(label='Error del invariante', children=[
+                        dcc.Graph(id='predprey-invariant-graph', style={'height': '100%'})
                     ])
                 ])
             ], md=9),
@@ -120,25 +153,80 @@ page_content = dbc.Card(
 )
 
 layout = html.Div([
-    html.Link(
-        rel='stylesheet',
-        href='https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap'
-    ),
     html.Div(
         page_content,
         style={'fontFamily': 'Outfit, sans-serif'}
     )
 ])
 
-def lotka_volterra(t, z, alpha, beta, gamma, delta):
-    x, y = z
-    dxdt = alpha * x - beta * x * y
-    dydt = delta * x * y - gamma * y
-    return [dxdt, dydt]
+def output_points(alpha, gamma, t_max):
+    cycles = t_max * np.sqrt(alpha * gamma) / (2 * np.pi)
+    return int(min(max(MIN_POINTS, POINTS_PER_CYCLE * cycles), MAX_POINTS))
+
+
+@cached_model('predprey_rk45')
+def predprey_rk45(x0, y0, alpha, beta, gamma, delta, t_max):
+    return rk45_solution(x0, y0, alpha, beta, gamma, delta, t_max)
+
+
+def predprey_at(x0, y0, alpha, beta, gamma, delta, t_max, method, t):
+    # RK45: interpolante denso en caché; simpléctico: evaluación directa en t
+    if method == 'rk45':
+        solution = predprey_rk45(x0, y0, alpha, beta, gamma, delta, t_max)
+        return None if solution is None else solution(t)
+    return solve_symplectic(x0, y0, alpha, beta, gamma, delta, t)
+
+
+@cached_model('predprey')
+def simulate_predprey(x0, y0, alpha, beta, gamma, delta, t_max, method='symplectic'):
+    t_eval = np.linspace(0, t_max, output_points(alpha, gamma, t_max))
+
+    result = predprey_at(x0, y0, alpha, beta, gamma, delta, t_max, method, t_eval)
+    if result is None:
+        return None
+    x, y = result
+
+    return t_eval, x, y, invariant_error(x, y, alpha, beta, gamma, delta)
+
+
+@cached_model('predprey_field')
+def phase_field(alpha, beta, gamma, delta, viewport, resolution):
+    return vector_field(alpha, beta, gamma, delta, viewport, resolution)
+
+
+def nullclines(alpha, beta, gamma, delta, viewport):
+    # ẋ = 0 en x = 0 y en y = α/β; ẏ = 0 en y = 0 y en x = γ/δ
+    x0, x1, y0, y1 = viewport
+    x_null = ([0, 0, None, x0, x1], [y0, y1, None, alpha / beta, alpha / beta])
+    y_null = ([x0, x1, None, gamma / delta, gamma / delta], [0, 0, None, y0, y1])
+    return x_null, y_null
+
+
+def arrow_size(resolution):
+    return min(max(320 / resolution, 5), 14)
+
+
+def add_phase_background(fig, alpha, beta, gamma, delta, viewport, resolution):
+    fx, fy, angle, magnitude = phase_field(alpha, beta, gamma, delta, viewport, resolution)
+    fig.add_trace(go.Scatter(
+        x=fx, y=fy, mode='markers', name='Campo', hoverinfo='skip',
+        marker=dict(symbol='arrow', angle=angle, size=arrow_size(resolution), color=magnitude,
+                    colorscale='Blues', cmin=magnitude.min(), cmax=magnitude.max(), opacity=0.6),
+    ))
+    x_null, y_null = nullclines(alpha, beta, gamma, delta, viewport)
+    fig.add_trace(go.Scatter(x=x_null[0], y=x_null[1], mode='lines', name='Nulclina ẋ = 0',
+                             line=dict(color='green', width=1.5, dash='dash')))
+    fig.add_trace(go.Scatter(x=y_null[0], y=y_null[1], mode='lines', name='Nulclina ẏ = 0',
+                             line=dict(color='red', width=1.5, dash='dash')))
+    points = equilibria(alpha, beta, gamma, delta)
+    fig.add_trace(go.Scatter(x=[p[0] for p in points], y=[p[1] for p in points], mode='markers',
+                             name='Equilibrios', marker=dict(color='black', size=9, symbol='x')))
 
 @callback(
     [Output('predprey-time-graph', 'figure'),
      Output('predprey-phase-graph', 'figure'),
+     Output('predprey-invariant-graph', 'figure'),
+     Output('predprey-phase-viewport', 'data'),
      Output('predprey-result', 'children')],
     [Input('predprey-x0-input', 'value'),
      Input('predprey-y0-input', 'value'),
@@ -146,36 +234,27 @@ def lotka_volterra(t, z, alpha, beta, gamma, delta):
      Input('predprey-beta-input', 'value'),
      Input('predprey-gamma-input', 'value'),
      Input('predprey-delta-input', 'value'),
-     Input('predprey-time-max-input', 'value')]
+     Input('predprey-time-max-input', 'value'),
+     Input('predprey-method-input', 'value'),
+     Input('predprey-field-resolution', 'value')]
 )
-def update_predprey_graph(x0, y0, alpha, beta, gamma, delta, t_max):
-    if None in (x0, y0, alpha, beta, gamma, delta, t_max):
-        return dash.no_update, dash.no_update, ""
+def update_predprey_graph(x0, y0, alpha, beta, gamma, delta, t_max, method, resolution):
+    no_change = (dash.no_update,) * 4
+    if None in (x0, y0, alpha, beta, gamma, delta, t_max, method, resolution):
+        return *no_change, ""
 
     if any(v <= 0 for v in [x0, y0, alpha, beta, gamma, delta]):
-        return dash.no_update, dash.no_update, "⚠️ Todos los parámetros deben ser > 0"
-
-    t_eval = np.linspace(0, t_max, 500)
+        return *no_change, "⚠️ Todos los parámetros deben ser > 0"
 
     try:
-        sol = solve_ivp(
-            lotka_volterra,
-            [0, t_max],
-            [x0, y0],
-            args=(alpha, beta, gamma, delta),
-            t_eval=t_eval,
-            method='RK45',
-            rtol=1e-6
-        )
+        result = simulate_predprey(x0, y0, alpha, beta, gamma, delta, t_max, method)
     except Exception as e:
-        return dash.no_update, dash.no_update, f"⚠️ Error en integración: {str(e)}"
+        return *no_change, f"⚠️ Error en integración: {str(e)}"
 
-    if not sol.success:
-        return dash.no_update, dash.no_update, "⚠️ La integración falló. Intenta con otros parámetros."
+    if result is None:
+        return *no_change, "⚠️ La integración falló. Intenta con otros parámetros."
 
-    t = sol.t
-    x = sol.y[0]
-    y = sol.y[1]
+    t, x, y, v_error = result
 
     fig_time = go.Figure()
     fig_time.add_trace(go.Scatter(x=t, y=x, mode='lines', name='Presas (x)', line=dict(color='green', width=2)))
@@ -188,13 +267,19 @@ def update_predprey_graph(x0, y0, alpha, beta, gamma, delta, t_max):
         font=dict(family="Outfit, sans-serif"),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
         margin=dict(l=40, r=20, t=50, b=40),
-        plot_bgcolor='lightyellow'
+        plot_bgcolor='lightyellow',
+        uirevision=f"{alpha},{beta},{gamma},{delta},{x0},{y0},{t_max},{method}",
     )
     fig_time.update_xaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray')
     fig_time.update_yaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray')
 
+    resolution = int(min(max(resolution, 5), 100))
+    x_eq, y_eq = gamma / delta, alpha / beta
+    viewport = snap_viewport((0, 1.1 * max(x.max(), x_eq)), (0, 1.1 * max(y.max(), y_eq)))
+
     fig_phase = go.Figure()
-    fig_phase.add_trace(go.Scatter(x=x, y=y, mode='lines', line=dict(color='purple', width=2)))
+    add_phase_background(fig_phase, alpha, beta, gamma, delta, viewport, resolution)
+    fig_phase.add_trace(go.Scatter(x=x, y=y, mode='lines', line=dict(color='purple', width=2), name='Trayectoria'))
     fig_phase.add_trace(go.Scatter(x=[x[0]], y=[y[0]], mode='markers', marker=dict(color='blue', size=8), name='Inicio'))
     fig_phase.update_layout(
         title="Diagrama de Fase: Presas vs Depredadores",
@@ -203,9 +288,124 @@ def update_predprey_graph(x0, y0, alpha, beta, gamma, delta, t_max):
         template="plotly_white",
         font=dict(family="Outfit, sans-serif"),
         margin=dict(l=40, r=20, t=50, b=40),
-        plot_bgcolor='lightcyan'
+        plot_bgcolor='lightcyan',
+        # Conserva el zoom del usuario mientras los Patch del campo actualizan las trazas
+        uirevision=f"{alpha},{beta},{gamma},{delta},{x0},{y0}",
     )
-    fig_phase.update_xaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray')
-    fig_phase.update_yaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray')
+    fig_phase.update_xaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray',
+                           range=list(viewport[:2]))
+    fig_phase.update_yaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray',
+                           range=list(viewport[2:]))
+
+    fig_invariant = go.Figure()
+    # Escala logarítmica: los ceros exactos se muestran en el piso de precisión
+    fig_invariant.add_trace(go.Scatter(x=t, y=np.maximum(v_error, np.finfo(float).eps), mode='lines',
+                                       line=dict(color='darkorange', width=1.5), name='|ΔV| / |V₀|'))
+    fig_invariant.update_layout(
+        title="Error relativo del invariante V = δx − γ ln x + βy − α ln y",
+        xaxis_title="Tiempo (t)",
+        yaxis_title="|V(t) − V(0)| / |V(0)|",
+        yaxis_type="log",
+        template="plotly_white",
+        font=dict(family="Outfit, sans-serif"),
+        margin=dict(l=40, r=20, t=50, b=40),
+    )
+    fig_invariant.update_xaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray')
+    fig_invariant.update_yaxes(showline=True, linewidth=1, linecolor='black', gridcolor='lightgray')
+
+    viewport_state = {'default': viewport, 'current': viewport}
+    summary = [
+        f" Simulación completada hasta t = {t_max}",
+        html.Div(f"Error máximo del invariante: {v_error.max():.2e}", className="small fw-normal text-muted"),
+    ]
+    return (prepare_figure(fig_time), prepare_figure(fig_phase), prepare_figure(fig_invariant),
+            viewport_state, summary)
+
+
+@callback(
+    [Output('predprey-phase-graph', 'figure', allow_duplicate=True),
+     Output('predprey-phase-viewport', 'data', allow_duplicate=True)],
+    Input('predprey-phase-graph', 'relayoutData'),
+    [State('predprey-phase-viewport', 'data'),
+     State('predprey-alpha-input', 'value'),
+     State('predprey-beta-input', 'value'),
+     State('predprey-gamma-input', 'value'),
+     State('predprey-delta-input', 'value'),
+     State('predprey-field-resolution', 'value')],
+    prevent_initial_call=True
+)
+def update_phase_field(relayout, viewport_state, alpha, beta, gamma, delta, resolution):
+    """Recalcula el campo y las nulclinas para el viewport tras un zoom o un pan."""
+    if not relayout or not viewport_state or None in (alpha, beta, gamma, delta, resolution):
+        return dash.no_update, dash.no_update
+    if any(v <= 0 for v in [alpha, beta, gamma, delta]):
+        return dash.no_update, dash.no_update
+
+    current = viewport_state['current']
+    if relayout.get('xaxis.autorange') or relayout.get('yaxis.autorange'):
+        viewport = tuple(viewport_state['default'])
+    else:
+        x_range, y_range = axis_range(relayout, 'xaxis'), axis_range(relayout, 'yaxis')
+        if x_range is None and y_range is None:
+            return dash.no_update, dash.no_update
+        viewport = snap_viewport(x_range or current[:2], y_range or current[2:])
+    if list(viewport) == list(current):
+        return dash.no_update, dash.no_update
+
+    resolution = int(min(max(resolution, 5), 100))
+    fx, fy, angle, magnitude = phase_field(alpha, beta, gamma, delta, viewport, resolution)
+    x_null, y_null = nullclines(alpha, beta, gamma, delta, viewport)
+
+    patched = Patch()
+    patched['data'][FIELD_TRACE]['x'] = array_payload(fx)
+    patched['data'][FIELD_TRACE]['y'] = array_payload(fy)
+    patched['data'][FIELD_TRACE]['marker']['angle'] = array_payload(angle)
+    patched['data'][FIELD_TRACE]['marker']['color'] = array_payload(magnitude)
+    patched['data'][FIELD_TRACE]['marker']['cmin'] = magnitude.min()
+    patched['data'][FIELD_TRACE]['marker']['cmax'] = magnitude.max()
+    patched['data'][X_NULLCLINE_TRACE]['x'] = x_null[0]
+    patched['data'][X_NULLCLINE_TRACE]['y'] = x_null[1]
+    patched['data'][Y_NULLCLINE_TRACE]['x'] = y_null[0]
+    patched['data'][Y_NULLCLINE_TRACE]['y'] = y_null[1]
+    return patched, {'default': viewport_state['default'], 'current': viewport}
+
+
+@callback(
+    Output('predprey-time-graph', 'figure', allow_duplicate=True),
+    Input('predprey-time-graph', 'relayoutData'),
+    [State('predprey-x0-input', 'value'),
+     State('predprey-y0-input', 'value'),
+     State('predprey-alpha-input', 'value'),
+     State('predprey-beta-input', 'value'),
+     State('predprey-gamma-input', 'value'),
+     State('predprey-delta-input', 'value'),
+     State('predprey-time-max-input', 'value'),
+     State('predprey-method-input', 'value')],
+    prevent_initial_call=True
+)
+def zoom_predprey_time(relayout, x0, y0, alpha, beta, gamma, delta, t_max, method):
+    """Vuelve a evaluar la ventana visible a resolución de pantalla."""
+    if None in (x0, y0, alpha, beta, gamma, delta, t_max, method):
+        return dash.no_update
+    if any(v <= 0 for v in [x0, y0, alpha, beta, gamma, delta]):
+        return dash.no_update
+    window = zoom_window(relayout, (0, t_max))
+    if window is None:
+        return dash.no_update
+
+    t = zoom_grid(window)
+    result = predprey_at(x0, y0, alpha, beta, gamma, delta, t_max, method, t)
+    if result is None:
+        return dash.no_update
+    x, y = result
+    return zoom_patch({0: (t, x), 1: (t, y)})
+
+
+def warm_up(values):
+    """Trayectoria y campo de fase iniciales en caché (warmup.py).
 
-    return fig_time, fig_phase, f" Simulación completada hasta t = {t_max}"
\ No newline at end of file
+    El viewport del campo sale de la trayectoria: se pasa por el callback.
+    """
+    update_predprey_graph(*(values[f'predprey-{name}'] for name in (
+        'x0-input', 'y0-input', 'alpha-input', 'beta-input', 'gamma-input', 'delta-input',
+        'time-max-input', 'method-input', 'field-resolution')))
@@ -1,9 +1,12 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from figures import evaluation_patch, prepare_figure, zoom_grid, zoom_patch, zoom_window
+from growth import sinusoidal_rate, variable_logistic
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo Logístico Variable')
 
@@ -21,16 +24,22 @@ page_content = dbc.Card(
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Ecuación Diferencial", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?\frac{dP}{dt}=r(t)P(1-\frac{P}{K})",
-                             style={'height': '55px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        \frac{dP}{dt}=r(t)P(1-\frac{P}{K})
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
 
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Ejemplo de r(t)", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?r(t)=r_0(1+\alpha\sin(\omega t))",
-                             style={'height': '50px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        r(t)=r_0(1+\alpha\sin(\omega t))
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
         ]),
@@ -119,13 +128,18 @@ page_content = dbc.Card(
 )
 
 layout = html.Div([
-    html.Link(
-        rel='stylesheet',
-        href='https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap'
-    ),
     html.Div(page_content, style={'fontFamily': 'Outfit, sans-serif'})
 ])
 
+@cached_model('variable_logistic')
+def variable_logistic_curve(p0, k, r0, alpha, omega, tmax):
+    t = np.linspace(0, tmax, 400)
+    r_t = sinusoidal_rate(r0, alpha, omega, t)[0]
+
+    # Solución exacta: r(t) se integra analíticamente
+    P = variable_logistic(p0, k, t, r0, alpha, omega)[0]
+    return t, P, r_t
+
 @callback(
     [Output('logvar-graph', 'figure'),
      Output('logvar-result', 'children')],
@@ -134,8 +148,8 @@ layout = html.Div([
      Input('logvar-r0', 'value'),
      Input('logvar-alpha', 'value'),
      Input('logvar-omega', 'value'),
-     Input('logvar-tmax', 'value'),
-     Input('logvar-teval', 'value')]
+     Input('logvar-tmax', 'value')],
+    State('logvar-teval', 'value')
 )
 def update_variable_logistic(p0, k, r0, alpha, omega, tmax, teval):
     if None in [p0, k, r0, alpha, omega, tmax, teval]:
@@ -146,17 +160,8 @@ def update_variable_logistic(p0, k, r0, alpha, omega, tmax, teval):
 
     teval = min(teval, tmax)
 
-    t = np.linspace(0, tmax, 400)
-    r_t = r0 * (1 + alpha * np.sin(omega * t))
-
-    dt = t[1] - t[0]
-    P = np.zeros_like(t)
-    P[0] = p0
-    for i in range(1, len(t)):
-        dP = r_t[i-1] * P[i-1] * (1 - P[i-1] / k)
-        P[i] = P[i-1] + dP * dt
-
-    P_eval = np.interp(teval, t, P)
+    t, P, r_t = variable_logistic_curve(p0, k, r0, alpha, omega, tmax)
+    P_eval = variable_logistic(p0, k, teval, r0, alpha, omega)[0, 0]
 
     fig = go.Figure()
 
@@ -196,10 +201,71 @@ def update_variable_logistic(p0, k, r0, alpha, omega, tmax, teval):
         font=dict(family="Outfit, sans-serif"),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
         margin=dict(l=40, r=20, t=60, b=40),
-        plot_bgcolor='lightblue'
+        plot_bgcolor='lightblue',
+        # El zoom del usuario se conserva mientras no cambie tₘₐₓ
+        uirevision=tmax
     )
 
     fig.update_xaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray', range=[0, tmax])
     fig.update_yaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
 
-    return fig, f"Población en t = {teval}: P(t) = {P_eval:.2f}"
+    return prepare_figure(fig), f"Población en t = {teval}: P(t) = {P_eval:.2f}"
+
+
+@callback(
+    [Output('logvar-graph', 'figure', allow_duplicate=True),
+     Output('logvar-result', 'children', allow_duplicate=True)],
+    Input('logvar-teval', 'value'),
+    [State('logvar-p0', 'value'),
+     State('logvar-k', 'value'),
+     State('logvar-r0', 'value'),
+     State('logvar-alpha', 'value'),
+     State('logvar-omega', 'value'),
+     State('logvar-tmax', 'value')],
+    prevent_initial_call=True
+)
+def update_variable_logistic_marker(teval, p0, k, r0, alpha, omega, tmax):
+    if None in [p0, k, r0, alpha, omega, tmax, teval]:
+        return dash.no_update, ""
+
+    if p0 >= k:
+        p0 = k / 2
+
+    teval = min(teval, tmax)
+    P_eval = variable_logistic(p0, k, teval, r0, alpha, omega)[0, 0]
+
+    return evaluation_patch(3, teval, P_eval), f"Población en t = {teval}: P(t) = {P_eval:.2f}"
+
+
+@callback(
+    Output('logvar-graph', 'figure', allow_duplicate=True),
+    Input('logvar-graph', 'relayoutData'),
+    [State('logvar-p0', 'value'),
+     State('logvar-k', 'value'),
+     State('logvar-r0', 'value'),
+     State('logvar-alpha', 'value'),
+     State('logvar-omega', 'value'),
+     State('logvar-tmax', 'value')],
+    prevent_initial_call=True
+)
+def zoom_variable_logistic(relayout, p0, k, r0, alpha, omega, tmax):
+    if None in [p0, k, r0, alpha, omega, tmax]:
+        return dash.no_update
+
+    if p0 >= k:
+        p0 = k / 2
+
+    window = zoom_window(relayout, (0, tmax))
+    if window is None:
+        return dash.no_update
+
+    # Solución exacta: la ventana visible se evalúa sin perder precisión
+    t = zoom_grid(window)
+    P = variable_logistic(p0, k, t, r0, alpha, omega)[0]
+    r_t = sinusoidal_rate(r0, alpha, omega, t)[0]
+    return zoom_patch({0: (t, P), 2: (t, r_t * 20)})
+
+
+def warm_up(values):
+    """Curva inicial en caché (warmup.py)."""
+    variable_logistic_curve(*(values[f'logvar-{name}'] for name in ('p0', 'k', 'r0', 'alpha', 'omega', 'tmax')))
@@ -1,9 +1,12 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from figures import evaluation_patch, prepare_figure, zoom_grid, zoom_patch, zoom_window
+from growth import logistic_migration
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo Logístico con Migración')
 
@@ -21,19 +24,31 @@ page_content = dbc.Card(
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Ecuación Diferencial", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?\frac{dP}{dt}=rP(1-\frac{P}{K})+M", 
-                             style={'height': '60px', 'display': 'block', 'margin': '10px auto'})
+                    dcc.Markdown(r"""
+                        $$
+                        \frac{dP}{dt}=rP(1-\frac{P}{K})+M
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE)
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
 
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Solución", className="card-title text-center"),
                 html.Div(
-                    html.P(
-                        "No existe una solución analítica cerrada para este modelo. "
-                        "Se resuelve mediante integración numérica (método de Euler).",
-                        className="text-center", style={'padding': '10px'}
-                    )
+                    dcc.Markdown(r"""
+                        $$
+                        P(t)=\frac{P_+(P_0-P_-)-P_-(P_0-P_+)e^{-\lambda t}}{(P_0-P_-)-(P_0-P_+)e^{-\lambda t}}
+                        $$
+                        $$
+                        P_\pm=\frac{K}{2}\left(1\pm\sqrt{1+\frac{4M}{rK}}\right),\quad \lambda=r\sqrt{1+\frac{4M}{rK}}
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
+                ),
+                html.P(
+                    "Es una ecuación de Riccati con solución exacta. Si la raíz es imaginaria (emigración "
+                    "fuerte) la solución usa una tangente y la población se extingue en tiempo finito; "
+                    "con r = 0 se reduce a P(t) = P₀ + Mt.",
+                    className="text-center", style={'padding': '10px'}
                 ),
             ]), style=INFO_CARD_STYLE), md=6, className="mb-4"),
         ]),
@@ -85,7 +100,7 @@ page_content = dbc.Card(
                           style=INPUT_STYLE_COMPACT, className="mb-3"),
 
                 dbc.Label("Tasa de Crecimiento (r):", className="small"),
-                dcc.Input(id='logmig-rate-input', type='number', value=0.15, min=0.01, step=0.01, 
+                dcc.Input(id='logmig-rate-input', type='number', value=0.15, min=0, step=0.01, 
                           style=INPUT_STYLE_COMPACT, className="mb-3"),
 
                 dbc.Label("Capacidad de Carga (K):", className="small"),
@@ -117,16 +132,18 @@ page_content = dbc.Card(
 )
 
 layout = html.Div([
-    html.Link(
-        rel='stylesheet',
-        href='https://fonts.googleapis.com/css2?family=Outfit:wght@100..900&display=swap'
-    ),
     html.Div(
         page_content,
         style={'fontFamily': 'Outfit, sans-serif'}
     )
 ])
 
+@cached_model('logistic_migration')
+def logistic_migration_curve(p0, r, k, m, t_max):
+    # Solución exacta (Riccati): la resolución es fija sin importar tₘₐₓ
+    t = np.linspace(0, t_max, 500)
+    return t, logistic_migration(p0, r, k, m, t)[0]
+
 @callback(
     [Output('logistic-migration-graph', 'figure'),
      Output('logmig-pop-result', 'children')],
@@ -134,28 +151,20 @@ layout = html.Div([
      Input('logmig-rate-input', 'value'),
      Input('logmig-capacity-input', 'value'),
      Input('logmig-migration-input', 'value'),
-     Input('logmig-time-max-input', 'value'),
-     Input('logmig-time-input', 'value')]
+     Input('logmig-time-max-input', 'value')],
+    State('logmig-time-input', 'value')
 )
 def update_logistic_migration_graph(p0, r, k, m, t_max, t_eval):
     if None in (p0, r, k, m, t_max, t_eval):
         return dash.no_update, ""
 
-    t_eval = min(t_eval, t_max)
-    dt = 0.1
-    n_steps = int(t_max / dt)
-    t = np.linspace(0, t_max, n_steps)
-    P = np.zeros(n_steps)
-    P[0] = p0
+    if p0 < 0 or r < 0 or k <= 0:
+        return dash.no_update, "⚠️ Asegúrate de que P₀ ≥ 0, r ≥ 0 y K > 0"
 
-    for i in range(1, n_steps):
-        dPdt = r * P[i-1] * (1 - P[i-1] / k) + m
-        P[i] = P[i-1] + dPdt * dt
-        if P[i] < 0:
-            P[i] = 0
+    t_eval = min(t_eval, t_max)
 
-    idx_eval = int(t_eval / dt)
-    P_eval = P[idx_eval] if idx_eval < len(P) else P[-1]
+    t, P = logistic_migration_curve(p0, r, k, m, t_max)
+    P_eval = logistic_migration(p0, r, k, m, t_eval)[0, 0]
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -195,10 +204,68 @@ def update_logistic_migration_graph(p0, r, k, m, t_max, t_eval):
             x=1
         ),
         margin=dict(l=40, r=20, t=60, b=40),
-        plot_bgcolor='lightblue'
+        plot_bgcolor='lightblue',
+        # El zoom del usuario se conserva mientras no cambie tₘₐₓ
+        uirevision=t_max
     )
 
     fig.update_xaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray', range=[0, t_max])
     fig.update_yaxes(showline=True, linewidth=2, linecolor='red', gridcolor='lightgray')
 
-    return fig, f"Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+    return prepare_figure(fig), f"Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+
+@callback(
+    [Output('logistic-migration-graph', 'figure', allow_duplicate=True),
+     Output('logmig-pop-result', 'children', allow_duplicate=True)],
+    Input('logmig-time-input', 'value'),
+    [State('logmig-initial-pop-input', 'value'),
+     State('logmig-rate-input', 'value'),
+     State('logmig-capacity-input', 'value'),
+     State('logmig-migration-input', 'value'),
+     State('logmig-time-max-input', 'value')],
+    prevent_initial_call=True
+)
+def update_logistic_migration_marker(t_eval, p0, r, k, m, t_max):
+    if None in (p0, r, k, m, t_max, t_eval):
+        return dash.no_update, ""
+
+    if p0 < 0 or r < 0 or k <= 0:
+        return dash.no_update, "⚠️ Asegúrate de que P₀ ≥ 0, r ≥ 0 y K > 0"
+
+    t_eval = min(t_eval, t_max)
+    P_eval = logistic_migration(p0, r, k, m, t_eval)[0, 0]
+
+    return evaluation_patch(2, t_eval, P_eval), f"Población en t = {t_eval}: P(t) = {P_eval:.2f}"
+
+
+@callback(
+    Output('logistic-migration-graph', 'figure', allow_duplicate=True),
+    Input('logistic-migration-graph', 'relayoutData'),
+    [State('logmig-initial-pop-input', 'value'),
+     State('logmig-rate-input', 'value'),
+     State('logmig-capacity-input', 'value'),
+     State('logmig-migration-input', 'value'),
+     State('logmig-time-max-input', 'value')],
+    prevent_initial_call=True
+)
+def zoom_logistic_migration(relayout, p0, r, k, m, t_max):
+    if None in (p0, r, k, m, t_max):
+        return dash.no_update
+
+    if p0 < 0 or r < 0 or k <= 0:
+        return dash.no_update
+
+    window = zoom_window(relayout, (0, t_max))
+    if window is None:
+        return dash.no_update
+
+    # Solución exacta (Riccati): la ventana visible se evalúa sin perder precisión
+    t = zoom_grid(window)
+    return zoom_patch({0: (t, logistic_migration(p0, r, k, m, t)[0])})
+
+
+def warm_up(values):
+    """Curva inicial en caché (warmup.py)."""
+    logistic_migration_curve(*(values[f'logmig-{name}-input'] for name in (
+        'initial-pop', 'rate', 'capacity', 'migration', 'time-max')))
@@ -1,9 +1,12 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback, clientside_callback, ClientsideFunction
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from config import CLIENTSIDE_CALLBACKS
+from figures import prepare_figure, zoom_grid, zoom_patch, zoom_window
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo SI')
 
@@ -19,8 +22,11 @@ page_content = dbc.Card(
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Sistema de Ecuaciones", className="card-title text-center"),
                 html.Div(
-                    html.Img(src=r"https://latex.codecogs.com/svg.latex?\frac{dS}{dt}=-\beta SI,\;\frac{dI}{dt}=\beta SI",
-                             style={'height': '50px', 'display': 'block', 'margin': '10px auto'}),
+                    dcc.Markdown(r"""
+                        $$
+                        \frac{dS}{dt}=-\beta SI,\;\frac{dI}{dt}=\beta SI
+                        $$
+                    """, mathjax=True, style=EQUATION_STYLE),
                 ),
             ]), style=INFO_CARD_STYLE), md=6),
 
@@ -62,30 +68,78 @@ page_content = dbc.Card(
     className="m-4"
 )
 
-layout = html.Div(page_content)
+def base_figure():
+    fig = go.Figure()
+    fig.update_layout(title="Dinámica del Modelo SI", xaxis_title="Tiempo", yaxis_title="Población")
+    return fig
+
+layout = html.Div([
+    page_content,
+    dcc.Store(id='si-base-figure', data=base_figure().to_plotly_json())
+])
+
+def si_solution(s0, i0, beta, t):
+    # Solución analítica
+    N = s0 + i0
+    I = (N * i0) / (i0 + (N - i0) * np.exp(-beta * N * t))
+    return N - I, I
+
+@cached_model('si')
+def si_curve(s0, i0, beta, tmax):
+    t = np.linspace(0, tmax, 300)
+    S, I = si_solution(s0, i0, beta, t)
+    return t, S, I
 
-@callback(
-    [Output('si-graph', 'figure'),
-     Output('si-result', 'children')],
-    [Input('si-s0', 'value'),
-     Input('si-i0', 'value'),
-     Input('si-beta', 'value'),
-     Input('si-tmax', 'value')]
-)
 def update_si(s0, i0, beta, tmax):
     if None in (s0, i0, beta, tmax):
         return dash.no_update, ""
     
-    N = s0 + i0
-    t = np.linspace(0, tmax, 300)
-
-    # Solución analítica
-    I = (N * i0) / (i0 + (N - i0) * np.exp(-beta * N * t))
-    S = N - I
+    t, S, I = si_curve(s0, i0, beta, tmax)
 
-    fig = go.Figure()
+    fig = base_figure()
     fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name="Susceptibles"))
     fig.add_trace(go.Scatter(x=t, y=I, mode='lines', name="Infectados"))
+    # El zoom del usuario se conserva mientras no cambie tₘₐₓ
+    fig.update_layout(uirevision=tmax)
 
-    fig.update_layout(title="Dinámica del Modelo SI", xaxis_title="Tiempo", yaxis_title="Población")
-    return fig, f" Infectados finales: I({tmax}) = {I[-1]:.2f}"
+    return prepare_figure(fig), f" Infectados finales: I({tmax}) = {I[-1]:.2f}"
+
+def zoom_si(relayout, s0, i0, beta, tmax):
+    if None in (s0, i0, beta, tmax):
+        return dash.no_update
+    window = zoom_window(relayout, (0, tmax))
+    if window is None:
+        return dash.no_update
+    t = zoom_grid(window)
+    S, I = si_solution(s0, i0, beta, t)
+    return zoom_patch({0: (t, S), 1: (t, I)})
+
+outputs = [Output('si-graph', 'figure'),
+           Output('si-result', 'children')]
+inputs = [Input('si-s0', 'value'),
+          Input('si-i0', 'value'),
+          Input('si-beta', 'value'),
+          Input('si-tmax', 'value')]
+states = [State(i.component_id, i.component_property) for i in inputs]
+zoom_output = Output('si-graph', 'figure', allow_duplicate=True)
+zoom_input = Input('si-graph', 'relayoutData')
+
+if CLIENTSIDE_CALLBACKS:
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='si'),
+        outputs, inputs, State('si-base-figure', 'data')
+    )
+    # Zoom: la ventana visible se vuelve a evaluar en el navegador
+    clientside_callback(
+        ClientsideFunction(namespace='models', function_name='siZoom'),
+        zoom_output, zoom_input, states + [State('si-graph', 'figure')],
+        prevent_initial_call=True
+    )
+else:
+    callback(outputs, inputs)(update_si)
+    callback(zoom_output, zoom_input, states, prevent_initial_call=True)(zoom_si)
+
+def warm_up(values):
+    """Curva inicial en caché (warmup.py); con CLIENTSIDE_CALLBACKS la dibuja el navegador."""
+    if not CLIENTSIDE_CALLBACKS:
+        si_curve(*(values[i.component_id] for i in inputs))
@@ -1,13 +1,37 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import numpy as np
-from scipy.integrate import odeint
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from epidemics import (
+    outbreak_statistics, peak_statistics, quantile_bands, run_replicates, sample_parameters, sir_ensemble,
+    sir_solution,
+)
+from figures import (
+    add_quantile_band, prepare_figure, stochastic_figures, zoom_grid, zoom_patch, zoom_window,
+)
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo SIR')
 
+# Tope de trayectorias por ensamble: todas se integran como un solo sistema
+ENSEMBLE_MAX = 5000
+ENSEMBLE_SEED = 12345
+
+# Réplicas estocásticas: semilla fija para que los mismos controles den el
+# mismo resultado; solo se dibujan unas pocas trayectorias de muestra
+STOCHASTIC_MAX = 10_000
+STOCHASTIC_SEED = 2024
+SAMPLE_PATHS = 20
+STOCHASTIC_METHODS = [
+    {'label': 'Automático', 'value': 'auto'},
+    {'label': 'Gillespie exacto', 'value': 'gillespie'},
+    {'label': 'Tau-leaping', 'value': 'tau-leap'},
+]
+METHOD_LABELS = {option['value']: option['label'] for option in STOCHASTIC_METHODS}
+
 page_content = dbc.Card(
     dbc.CardBody([
         html.H2("Modelo Epidemiológico SIR", className="card-title text-center mb-4"),
@@ -21,10 +45,11 @@ page_content = dbc.Card(
         dbc.Row([
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Sistema de Ecuaciones Diferenciales", className="card-title text-center"),
-                html.Img(
-                    src=r"https://latex.codecogs.com/svg.latex?\frac{dS}{dt}=-\beta SI,\;\frac{dI}{dt}=\beta SI-\gamma I,\;\frac{dR}{dt}=\gamma I",
-                    style={'display': 'block', 'margin': '10px auto', 'height': '60px'}
-                )
+                dcc.Markdown(r"""
+                    $$
+                    \frac{dS}{dt}=-\beta SI,\;\frac{dI}{dt}=\beta SI-\gamma I,\;\frac{dR}{dt}=\gamma I
+                    $$
+                """, mathjax=True, style=EQUATION_STYLE)
             ]), style=INFO_CARD_STYLE), md=6),
 
             dbc.Col(dbc.Card(dbc.CardBody([
@@ -75,6 +100,66 @@ page_content = dbc.Card(
 
             dbc.Col(dcc.Graph(id='sir-graph', style={'height': '100%'}), md=9),
         ], align="center", className="mt-4"),
+
+        html.Hr(className="my-4"),
+
+        dbc.Row([
+            dbc.Col([
+                html.H4("Ensamble", className="text-center fw-bold mb-3"),
+                html.P("Variación uniforme alrededor de los parámetros de arriba.",
+                       className="small text-muted text-center"),
+
+                dbc.Label("Variación de β (± %):", className="small"),
+                dcc.Input(id='sir-ens-beta', type='number', value=20, min=0, max=100, step=1,
+                          style=INPUT_STYLE_COMPACT, className="mb-3"),
+
+                dbc.Label("Variación de γ (± %):", className="small"),
+                dcc.Input(id='sir-ens-gamma', type='number', value=20, min=0, max=100, step=1,
+                          style=INPUT_STYLE_COMPACT, className="mb-3"),
+
+                dbc.Label("Variación de I₀ (± %):", className="small"),
+                dcc.Input(id='sir-ens-i0', type='number', value=0, min=0, max=100, step=1,
+                          style=INPUT_STYLE_COMPACT, className="mb-3"),
+
+                dbc.Label("Número de simulaciones:", className="small"),
+                dcc.Input(id='sir-ens-n', type='number', value=1000, min=10, max=ENSEMBLE_MAX, step=10,
+                          style=INPUT_STYLE_COMPACT, className="mb-3"),
+
+                dbc.Button("Simular ensamble", id='sir-ens-btn', color="primary", className="w-100"),
+                html.Div(id='sir-ens-result', className="text-center small mt-3"),
+            ], md=3),
+
+            dbc.Col([
+                dcc.Graph(id='sir-ens-graph'),
+                dcc.Graph(id='sir-ens-peaks'),
+            ], md=9),
+        ], align="start", className="mt-4"),
+
+        html.Hr(className="my-4"),
+
+        dbc.Row([
+            dbc.Col([
+                html.H4("Simulación estocástica", className="text-center fw-bold mb-3"),
+                html.P("Población finita con los parámetros de arriba: cada réplica es un brote posible.",
+                       className="small text-muted text-center"),
+
+                dbc.Label("Número de réplicas:", className="small"),
+                dcc.Input(id='sir-sto-n', type='number', value=1000, min=10, max=STOCHASTIC_MAX, step=10,
+                          style=INPUT_STYLE_COMPACT, className="mb-3"),
+
+                dbc.Label("Método:", className="small"),
+                dcc.Dropdown(id='sir-sto-method', options=STOCHASTIC_METHODS, value='auto',
+                             clearable=False, className="mb-3"),
+
+                dbc.Button("Simular réplicas", id='sir-sto-btn', color="primary", className="w-100"),
+                html.Div(id='sir-sto-result', className="text-center small mt-3"),
+            ], md=3),
+
+            dbc.Col([
+                dcc.Graph(id='sir-sto-graph'),
+                dcc.Graph(id='sir-sto-sizes'),
+            ], md=9),
+        ], align="start", className="mt-4"),
     ]),
     className="m-4"
 )
@@ -82,6 +167,18 @@ page_content = dbc.Card(
 layout = html.Div(page_content)
 
 
+@cached_model('sir_solution')
+def sir_interpolant(s0, i0, r0, beta, gamma, tmax):
+    return sir_solution(s0, i0, r0, beta, gamma, tmax)
+
+
+@cached_model('sir')
+def simulate_sir(s0, i0, r0, beta, gamma, tmax):
+    t = np.linspace(0, tmax, 400)
+    S, I, R = sir_interpolant(s0, i0, r0, beta, gamma, tmax)(t)
+    return t, S, I, R
+
+
 @callback(
     [Output('sir-graph', 'figure'),
      Output('sir-result', 'children')],
@@ -98,16 +195,10 @@ def update_sir(s0, i0, r0, beta, gamma, tmax):
 
     N = s0 + i0 + r0
 
-    def sir_eq(y, t):
-        S, I, R = y
-        dSdt = -beta * S * I
-        dIdt = beta * S * I - gamma * I
-        dRdt = gamma * I
-        return dSdt, dIdt, dRdt
-
-    t = np.linspace(0, tmax, 400)
-    sol = odeint(sir_eq, (s0, i0, r0), t)
-    S, I, R = sol.T
+    try:
+        t, S, I, R = simulate_sir(s0, i0, r0, beta, gamma, tmax)
+    except RuntimeError as exc:
+        return dash.no_update, f"La integración falló: {exc}"
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name="Ignorante"))
@@ -116,8 +207,180 @@ def update_sir(s0, i0, r0, beta, gamma, tmax):
 
     fig.update_layout(title="Dinámica del Modelo SIR",
                       xaxis_title="Tiempo", yaxis_title="Población",
-                      template="plotly_white")
+                      template="plotly_white", uirevision=tmax)
 
     peak_infected = np.max(I)
 
-    return fig, f"Pico máximo de infectados: {peak_infected:.2f}"
+    return prepare_figure(fig), f"Pico máximo de infectados: {peak_infected:.2f}"
+
+
+@callback(
+    Output('sir-graph', 'figure', allow_duplicate=True),
+    Input('sir-graph', 'relayoutData'),
+    [State('sir-s0', 'value'),
+     State('sir-i0', 'value'),
+     State('sir-r0', 'value'),
+     State('sir-beta', 'value'),
+     State('sir-gamma', 'value'),
+     State('sir-tmax', 'value')],
+    prevent_initial_call=True
+)
+def zoom_sir(relayout, s0, i0, r0, beta, gamma, tmax):
+    if None in (s0, i0, r0, beta, gamma, tmax):
+        return dash.no_update
+    window = zoom_window(relayout, (0, tmax))
+    if window is None:
+        return dash.no_update
+
+    # El interpolante denso ya está en caché: no se vuelve a integrar
+    t = zoom_grid(window)
+    try:
+        S, I, R = sir_interpolant(s0, i0, r0, beta, gamma, tmax)(t)
+    except RuntimeError:
+        return dash.no_update
+    return zoom_patch({0: (t, S), 1: (t, I), 2: (t, R)})
+
+
+def _spread(value, percent):
+    if not percent:
+        return value
+    delta = abs(value) * percent / 100
+    return (value - delta, value + delta)
+
+
+@cached_model('sir_ensemble')
+def simulate_sir_ensemble(s0, i0, r0, beta, gamma, tmax, beta_pct, gamma_pct, i0_pct, n):
+    # Semilla fija: los mismos controles dan el mismo ensamble (y la misma clave de caché)
+    params = sample_parameters(
+        n, ENSEMBLE_SEED,
+        beta=_spread(beta, beta_pct),
+        gamma=_spread(gamma, gamma_pct),
+        i0=_spread(i0, i0_pct),
+    )
+    t = np.linspace(0, tmax, 400)
+    S, I, R = sir_ensemble(params['beta'], params['gamma'], s0, params['i0'], r0, t)
+    peak_size, peak_time = peak_statistics(t, I)
+    # Solo se guardan los resúmenes, no las n trayectorias
+    return t, quantile_bands(S), quantile_bands(I), quantile_bands(R), peak_size, peak_time
+
+
+ENSEMBLE_COLORS = {
+    "Ignorante": "31, 119, 180",
+    "Divulgadores": "255, 127, 14",
+    "Racionales": "44, 160, 44",
+}
+
+
+@callback(
+    [Output('sir-ens-graph', 'figure'),
+     Output('sir-ens-peaks', 'figure'),
+     Output('sir-ens-result', 'children')],
+    Input('sir-ens-btn', 'n_clicks'),
+    [State('sir-s0', 'value'),
+     State('sir-i0', 'value'),
+     State('sir-r0', 'value'),
+     State('sir-beta', 'value'),
+     State('sir-gamma', 'value'),
+     State('sir-tmax', 'value'),
+     State('sir-ens-beta', 'value'),
+     State('sir-ens-gamma', 'value'),
+     State('sir-ens-i0', 'value'),
+     State('sir-ens-n', 'value')],
+    prevent_initial_call=True
+)
+def update_sir_ensemble(n_clicks, s0, i0, r0, beta, gamma, tmax, beta_pct, gamma_pct, i0_pct, n):
+    if None in (s0, i0, r0, beta, gamma, tmax, beta_pct, gamma_pct, i0_pct, n):
+        return dash.no_update, dash.no_update, "Completa todos los parámetros."
+
+    n = int(min(max(n, 2), ENSEMBLE_MAX))
+    try:
+        t, S, I, R, peak_size, peak_time = simulate_sir_ensemble(
+            s0, i0, r0, beta, gamma, tmax, beta_pct, gamma_pct, i0_pct, n
+        )
+    except RuntimeError as exc:
+        return dash.no_update, dash.no_update, f"La integración falló: {exc}"
+
+    fig = go.Figure()
+    add_quantile_band(fig, t, S, "Ignorante", ENSEMBLE_COLORS["Ignorante"])
+    add_quantile_band(fig, t, I, "Divulgadores", ENSEMBLE_COLORS["Divulgadores"])
+    add_quantile_band(fig, t, R, "Racionales", ENSEMBLE_COLORS["Racionales"])
+    fig.update_layout(title=f"Ensamble SIR ({n} simulaciones)",
+                      xaxis_title="Tiempo", yaxis_title="Población",
+                      template="plotly_white")
+
+    peaks = make_subplots(rows=1, cols=2,
+                          subplot_titles=("Tamaño del pico de infectados", "Momento del pico"))
+    peaks.add_trace(go.Histogram(x=peak_size, nbinsx=40, name="Tamaño",
+                                 marker_color=f"rgb({ENSEMBLE_COLORS['Divulgadores']})"), row=1, col=1)
+    peaks.add_trace(go.Histogram(x=peak_time, nbinsx=40, name="Momento",
+                                 marker_color="rgb(148, 103, 189)"), row=1, col=2)
+    peaks.update_xaxes(title_text="Infectados", row=1, col=1)
+    peaks.update_xaxes(title_text="Tiempo", row=1, col=2)
+    peaks.update_yaxes(title_text="Simulaciones", row=1, col=1)
+    peaks.update_layout(showlegend=False, template="plotly_white")
+
+    p5, p50, p95 = np.quantile(peak_size, (0.05, 0.5, 0.95))
+    t5, t50, t95 = np.quantile(peak_time, (0.05, 0.5, 0.95))
+    summary = html.Div([
+        html.Div(f"Pico de infectados: {p50:.2f} (90%: {p5:.2f} – {p95:.2f})", className="fw-bold"),
+        html.Div(f"Momento del pico: {t50:.2f} (90%: {t5:.2f} – {t95:.2f})"),
+    ])
+    return prepare_figure(fig), prepare_figure(peaks), summary
+
+
+@cached_model('sir_stochastic')
+def simulate_sir_stochastic(s0, i0, r0, beta, gamma, tmax, replicates, method):
+    t = np.linspace(0, tmax, 200)
+    states, method = run_replicates('sir', (s0, i0, r0), {'beta': beta, 'gamma': gamma}, t,
+                                    replicates, seed=STOCHASTIC_SEED, method=method)
+    stats = outbreak_statistics('sir', states)
+    I = states[1]
+    return (t, quantile_bands(I), I[:SAMPLE_PATHS].copy(), stats['outbreak_size'],
+            stats['extinction_probability'], method)
+
+
+BAND_NAME = "Divulgadores"
+BAND_COLOR = ENSEMBLE_COLORS[BAND_NAME]
+
+
+@callback(
+    [Output('sir-sto-graph', 'figure'),
+     Output('sir-sto-sizes', 'figure'),
+     Output('sir-sto-result', 'children')],
+    Input('sir-sto-btn', 'n_clicks'),
+    [State('sir-s0', 'value'),
+     State('sir-i0', 'value'),
+     State('sir-r0', 'value'),
+     State('sir-beta', 'value'),
+     State('sir-gamma', 'value'),
+     State('sir-tmax', 'value'),
+     State('sir-sto-n', 'value'),
+     State('sir-sto-method', 'value')],
+    prevent_initial_call=True
+)
+def update_sir_stochastic(n_clicks, s0, i0, r0, beta, gamma, tmax, replicates, method):
+    if None in (s0, i0, r0, beta, gamma, tmax, replicates, method):
+        return dash.no_update, dash.no_update, "Completa todos los parámetros."
+    if min(s0, i0, r0, beta, gamma) < 0:
+        return dash.no_update, dash.no_update, "Las poblaciones y las tasas no pueden ser negativas."
+
+    replicates = int(min(max(replicates, 1), STOCHASTIC_MAX))
+    try:
+        t, bands, samples, outbreak_size, extinction, method = simulate_sir_stochastic(
+            round(s0), round(i0), round(r0), beta, gamma, tmax, replicates, method
+        )
+    except ValueError as exc:
+        return dash.no_update, dash.no_update, str(exc)
+    fig, sizes = stochastic_figures(t, bands, samples, outbreak_size, BAND_NAME, BAND_COLOR)
+    summary = html.Div([
+        html.Div(f"Probabilidad de extinción temprana: {extinction:.1%}", className="fw-bold"),
+        html.Div(f"Tamaño medio del brote: {np.mean(outbreak_size):.1f} "
+                 f"(mediana {np.median(outbreak_size):.0f})"),
+        html.Div(f"Método: {METHOD_LABELS[method]} · {replicates} réplicas", className="text-muted"),
+    ])
+    return prepare_figure(fig), prepare_figure(sizes), summary
+
+
+def warm_up(values):
+    """Solución determinista inicial en caché (warmup.py)."""
+    simulate_sir(*(values[f'sir-{name}'] for name in ('s0', 'i0', 'r0', 'beta', 'gamma', 'tmax')))
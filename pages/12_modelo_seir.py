@@ -1,13 +1,27 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import odeint
-from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from cache import cached_model
+from epidemics import outbreak_statistics, quantile_bands, run_replicates, seir
+from figures import prepare_figure, stochastic_figures, zoom_grid, zoom_patch, zoom_window
+from styles import EQUATION_STYLE, INPUT_STYLE_COMPACT, INFO_CARD_STYLE
 
 dash.register_page(__name__, name='Modelo SEIR')
 
+# Réplicas estocásticas: semilla fija para que los mismos controles den el
+# mismo resultado; solo se dibujan unas pocas trayectorias de muestra
+STOCHASTIC_MAX = 10_000
+STOCHASTIC_SEED = 2024
+SAMPLE_PATHS = 20
+STOCHASTIC_METHODS = [
+    {'label': 'Automático', 'value': 'auto'},
+    {'label': 'Gillespie exacto', 'value': 'gillespie'},
+    {'label': 'Tau-leaping', 'value': 'tau-leap'},
+]
+METHOD_LABELS = {option['value']: option['label'] for option in STOCHASTIC_METHODS}
+
 page_content = dbc.Card(
     dbc.CardBody([
         html.H2("Modelo Epidemiológico SEIR", className="card-title text-center mb-4"),
@@ -21,10 +35,11 @@ page_content = dbc.Card(
         dbc.Row([
             dbc.Col(dbc.Card(dbc.CardBody([
                 html.H5("Sistema de Ecuaciones Diferenciales", className="card-title text-center"),
-                html.Img(
-                    src=r"https://latex.codecogs.com/svg.latex?\frac{dS}{dt}=-\beta SI,\;\frac{dE}{dt}=\beta SI-\sigma E,\;\frac{dI}{dt}=\sigma E-\gamma I,\;\frac{dR}{dt}=\gamma I",
-                    style={'display': 'block', 'margin': '10px auto', 'height': '65px'}
-                )
+                dcc.Markdown(r"""
+                    $$
+                    \frac{dS}{dt}=-\beta SI,\;\frac{dE}{dt}=\beta SI-\sigma E,\;\frac{dI}{dt}=\sigma E-\gamma I,\;\frac{dR}{dt}=\gamma I
+                    $$
+                """, mathjax=True, style=EQUATION_STYLE)
             ]), style=INFO_CARD_STYLE), md=6),
 
             dbc.Col(dbc.Card(dbc.CardBody([
@@ -84,6 +99,32 @@ page_content = dbc.Card(
 
             dbc.Col(dcc.Graph(id='seir-graph', style={'height': '100%'}), md=9),
         ], align="center", className="mt-4"),
+
+        html.Hr(className="my-4"),
+
+        dbc.Row([
+            dbc.Col([
+                html.H4("Simulación estocástica", className="text-center fw-bold mb-3"),
+                html.P("Población finita con los parámetros de arriba: cada réplica es un brote posible.",
+                       className="small text-muted text-center"),
+
+                dbc.Label("Número de réplicas:", className="small"),
+                dcc.Input(id='seir-sto-n', type='number', value=1000, min=10, max=STOCHASTIC_MAX, step=10,
+                          style=INPUT_STYLE_COMPACT, className="mb-3"),
+
+                dbc.Label("Método:", className="small"),
+                dcc.Dropdown(id='seir-sto-method', options=STOCHASTIC_METHODS, value='auto',
+                             clearable=False, className="mb-3"),
+
+                dbc.Button("Simular réplicas", id='seir-sto-btn', color="primary", className="w-100"),
+                html.Div(id='seir-sto-result', className="text-center small mt-3"),
+            ], md=3),
+
+            dbc.Col([
+                dcc.Graph(id='seir-sto-graph'),
+                dcc.Graph(id='seir-sto-sizes'),
+            ], md=9),
+        ], align="start", className="mt-4"),
     ]),
     className="m-4"
 )
@@ -91,6 +132,13 @@ page_content = dbc.Card(
 layout = html.Div(page_content)
 
 
+@cached_model('seir')
+def simulate_seir(s0, e0, i0, r0, beta, sigma, gamma, tmax):
+    t = np.linspace(0, tmax, 500)
+    S, E, I, R, info = seir(s0, e0, i0, r0, beta, sigma, gamma, t, dense_output=True)
+    return t, S, E, I, R, info
+
+
 @callback(
     [Output('seir-graph', 'figure'),
      Output('seir-result', 'children')],
@@ -109,17 +157,10 @@ def update_seir(s0, e0, i0, r0, beta, sigma, gamma, tmax):
 
     N = s0 + e0 + i0 + r0
 
-    def seir_eq(y, t):
-        S, E, I, R = y
-        dSdt = -beta * S * I
-        dEdt = beta * S * I - sigma * E
-        dIdt = sigma * E - gamma * I
-        dRdt = gamma * I
-        return dSdt, dEdt, dIdt, dRdt
-
-    t = np.linspace(0, tmax, 500)
-    sol = odeint(seir_eq, (s0, e0, i0, r0), t)
-    S, E, I, R = sol.T
+    try:
+        t, S, E, I, R, info = simulate_seir(s0, e0, i0, r0, beta, sigma, gamma, tmax)
+    except RuntimeError as exc:
+        return dash.no_update, f"La integración falló: {exc}"
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name="Susceptibles"))
@@ -131,10 +172,107 @@ def update_seir(s0, e0, i0, r0, beta, sigma, gamma, tmax):
         title="Dinámica del Modelo SEIR",
         xaxis_title="Tiempo",
         yaxis_title="Población",
-        template="plotly_white"
+        template="plotly_white",
+        # El zoom del usuario se conserva mientras no cambie tₘₐₓ
+        uirevision=tmax
     )
 
     peak_infected = np.max(I)
     peak_time = t[np.argmax(I)]
 
-    return fig, f"Pico de infectados: {peak_infected:.2f} en t ≈ {peak_time:.2f}"
+    return prepare_figure(fig), [
+        f"Pico de infectados: {peak_infected:.2f} en t ≈ {peak_time:.2f}",
+        html.Div(f"Método: {info['method']} · {info['nfev']} evaluaciones del sistema",
+                 className="small fw-normal text-muted"),
+    ]
+
+
+@callback(
+    Output('seir-graph', 'figure', allow_duplicate=True),
+    Input('seir-graph', 'relayoutData'),
+    [State('seir-s0', 'value'),
+     State('seir-e0', 'value'),
+     State('seir-i0', 'value'),
+     State('seir-r0', 'value'),
+     State('seir-beta', 'value'),
+     State('seir-sigma', 'value'),
+     State('seir-gamma', 'value'),
+     State('seir-tmax', 'value')],
+    prevent_initial_call=True
+)
+def zoom_seir(relayout, s0, e0, i0, r0, beta, sigma, gamma, tmax):
+    if None in (s0, e0, i0, r0, beta, sigma, gamma, tmax):
+        return dash.no_update
+    window = zoom_window(relayout, (0, tmax))
+    if window is None:
+        return dash.no_update
+
+    # El interpolante denso viene con la simulación en caché
+    try:
+        info = simulate_seir(s0, e0, i0, r0, beta, sigma, gamma, tmax)[-1]
+    except RuntimeError:
+        return dash.no_update
+    t = zoom_grid(window)
+    S, E, I, R = info['solution'](t)
+    return zoom_patch({0: (t, S), 1: (t, E), 2: (t, I), 3: (t, R)})
+
+
+@cached_model('seir_stochastic')
+def simulate_seir_stochastic(s0, e0, i0, r0, beta, sigma, gamma, tmax, replicates, method):
+    t = np.linspace(0, tmax, 200)
+    params = {'beta': beta, 'sigma': sigma, 'gamma': gamma}
+    states, method = run_replicates('seir', (s0, e0, i0, r0), params, t,
+                                    replicates, seed=STOCHASTIC_SEED, method=method)
+    stats = outbreak_statistics('seir', states)
+    I = states[2]
+    return (t, quantile_bands(I), I[:SAMPLE_PATHS].copy(), stats['outbreak_size'],
+            stats['extinction_probability'], method)
+
+
+BAND_NAME = "Infectados"
+BAND_COLOR = "214, 39, 40"
+
+
+@callback(
+    [Output('seir-sto-graph', 'figure'),
+     Output('seir-sto-sizes', 'figure'),
+     Output('seir-sto-result', 'children')],
+    Input('seir-sto-btn', 'n_clicks'),
+    [State('seir-s0', 'value'),
+     State('seir-e0', 'value'),
+     State('seir-i0', 'value'),
+     State('seir-r0', 'value'),
+     State('seir-beta', 'value'),
+     State('seir-sigma', 'value'),
+     State('seir-gamma', 'value'),
+     State('seir-tmax', 'value'),
+     State('seir-sto-n', 'value'),
+     State('seir-sto-method', 'value')],
+    prevent_initial_call=True
+)
+def update_seir_stochastic(n_clicks, s0, e0, i0, r0, beta, sigma, gamma, tmax, replicates, method):
+    if None in (s0, e0, i0, r0, beta, sigma, gamma, tmax, replicates, method):
+        return dash.no_update, dash.no_update, "Completa todos los parámetros."
+    if min(s0, e0, i0, r0, beta, sigma, gamma) < 0:
+        return dash.no_update, dash.no_update, "Las poblaciones y las tasas no pueden ser negativas."
+
+    replicates = int(min(max(replicates, 1), STOCHASTIC_MAX))
+    try:
+        t, bands, samples, outbreak_size, extinction, method = simulate_seir_stochastic(
+            round(s0), round(e0), round(i0), round(r0), beta, sigma, gamma, tmax, replicates, method
+        )
+    except ValueError as exc:
+        return dash.no_update, dash.no_update, str(exc)
+    fig, sizes = stochastic_figures(t, bands, samples, outbreak_size, BAND_NAME, BAND_COLOR)
+    summary = html.Div([
+        html.Div(f"Probabilidad de extinción temprana: {extinction:.1%}", className="fw-bold"),
+        html.Div(f"Tamaño medio del brote: {np.mean(outbreak_size):.1f} "
+                 f"(mediana {np.median(outbreak_size):.0f})"),
+        html.Div(f"Método: {METHOD_LABELS[method]} · {replicates} réplicas", className="text-muted"),
+    ])
+    return prepare_figure(fig), prepare_figure(sizes), summary
+
+
+def warm_up(values):
+    """Solución determinista inicial en caché (warmup.py)."""
+    simulate_seir(*(values[f'seir-{name}'] for name in ('s0', 'e0', 'i0', 'r0', 'beta', 'sigma', 'gamma', 'tmax')))
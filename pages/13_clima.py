@@ -1,69 +1,19 @@
+import re
+import uuid
+
 import dash
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
-import requests
 import plotly.express as px
-import pandas as pd
+import plotly.graph_objects as go
+from figures import prepare_figure
+from http_client import RequestException
+from weather import CacheMiss, comparar_ciudades, geocode, obtener_clima
 
 dash.register_page(__name__, name="Clima Global")
 
 # ============================================================
-#  1. FUNCIÓN PARA OBTENER LAT/LON DE UNA CIUDAD (GEOCODING)
-# ============================================================
-def geocode(ciudad):
-    url = f"https://nominatim.openstreetmap.org/search?format=json&q={ciudad}"
-
-    headers = {
-        "User-Agent": "Dash Weather App (contact: ejemplo@example.com)"
-    }
-
-    r = requests.get(url, headers=headers)
-
-    # Intentar convertir a JSON
-    try:
-        data = r.json()
-    except Exception:
-        return None
-
-    # Si la ciudad no existe o está mal escrita
-    if not data:
-        return None
-
-    return {
-        "lat": float(data[0]["lat"]),
-        "lon": float(data[0]["lon"]),
-        "name": data[0]["display_name"],
-    }
-
-
-# ============================================================
-#  2. FUNCIÓN PARA OBTENER CLIMA
-# ============================================================
-def obtener_clima(lat, lon):
-    url_meteo = (
-        f"https://api.open-meteo.com/v1/forecast?"
-        f"latitude={lat}&longitude={lon}&hourly=temperature_2m"
-    )
-
-    r = requests.get(url_meteo)
-    data = r.json()
-
-    if "hourly" not in data:
-        return None
-
-    horas = data["hourly"]["time"]
-    temps = data["hourly"]["temperature_2m"]
-
-    df = pd.DataFrame({
-        "Hora": pd.to_datetime(horas),
-        "Temperatura (°C)": temps,
-    })
-
-    return df
-
-
-# ============================================================
-#  3. LAYOUT (LO QUE SE VE EN LA PÁGINA)
+#  1. LAYOUT (LO QUE SE VE EN LA PÁGINA)
 # ============================================================
 layout = dbc.Container(
     [
@@ -81,9 +31,20 @@ layout = dbc.Container(
 
             dbc.Col([
                 dbc.Button("Buscar Clima", id="btn-buscar", color="primary", className="w-100")
-            ], md=4)
+            ], md=3),
+
+            dbc.Col([
+                dbc.Button("Cancelar", id="btn-cancelar", color="secondary", outline=True,
+                           className="w-100", disabled=True)
+            ], md=1)
         ], className="mb-3"),
 
+        dbc.Progress(id="clima-progreso", value=0, striped=True, animated=True,
+                     className="mb-3", style={"visibility": "hidden"}),
+
+        # Búsqueda que no estaba en caché y pasa al background callback
+        dcc.Store(id="clima-pendiente"),
+
         html.Div(id="info-ciudad"),
 
         dbc.Card(
@@ -94,40 +55,84 @@ layout = dbc.Container(
                 )
             ]),
             className="mt-3"
+        ),
+
+        html.Hr(className="my-4"),
+
+        # Comparación de varias ciudades
+        html.H4("📊 Comparar varias ciudades", className="mb-3"),
+        dbc.Row([
+            dbc.Col([
+                dbc.Textarea(
+                    id="ciudades-input",
+                    placeholder="Una ciudad por línea (ej: Lima, Madrid, Tokyo en líneas separadas)",
+                    style={"height": "120px"},
+                )
+            ], md=8),
+
+            dbc.Col([
+                dbc.Button("Comparar", id="btn-comparar", color="primary", className="w-100")
+            ], md=3),
+
+            dbc.Col([
+                dbc.Button("Cancelar", id="btn-cancelar-comparacion", color="secondary", outline=True,
+                           className="w-100", disabled=True)
+            ], md=1)
+        ], className="mb-3"),
+
+        dbc.Progress(id="comparacion-progreso", value=0, striped=True, animated=True,
+                     className="mb-3", style={"visibility": "hidden"}),
+
+        dcc.Store(id="comparacion-pendiente"),
+
+        html.Div(id="info-comparacion"),
+
+        dbc.Card(
+            dbc.CardBody([
+                dcc.Loading(
+                    dcc.Graph(id="grafico-comparacion", figure={}),
+                    type="circle"
+                )
+            ]),
+            className="mt-3"
         )
     ],
     fluid=True
 )
 
 
+SERVICIO_NO_DISPONIBLE = dbc.Alert(
+    "⚠ El servicio de clima no respondió a tiempo. Intenta de nuevo en unos segundos.",
+    color="warning"
+)
+
+
 # ============================================================
-#  4. CALLBACK
+#  2. CALLBACK
 # ============================================================
-@dash.callback(
-    Output("info-ciudad", "children"),
-    Output("grafico-temp", "figure"),
-    Input("btn-buscar", "n_clicks"),
-    State("ciudad-input", "value"),
-)
-def actualizar_clima(n_clicks, ciudad_input):
-    if not n_clicks or not ciudad_input:
-        return "", {}
+# Cada búsqueda se resuelve primero con las cachés del proceso del servidor
+# (LRU en memoria, sesión HTTP y refresco de pronósticos vencidos viven ahí).
+# Solo lo que falta en caché pasa, vía clima-pendiente, al background callback
+# (DiskcacheManager, ver app.py), que corre en un proceso nuevo por búsqueda:
+# el worker queda libre mientras se consultan los servicios externos. Toda
+# búsqueda escribe clima-pendiente (sin ciudad si se resolvió desde caché): así
+# el background callback vuelve a dispararse y Dash cancela el job anterior,
+# que ya no puede pisar un resultado más nuevo. Cada escritura lleva un id
+# único: Dash arma la clave del job con sus argumentos y, si dos usuarios
+# buscan lo mismo, el primero en leer el resultado lo borra y el otro espera
+# para siempre. weather, pandas y plotly.express se importan al arrancar para
+# que ese proceso, un fork del forkserver que ya importó la app (ver
+# background.py), los herede ya cargados.
+def _pendiente(**datos):
+    return {"id": uuid.uuid4().hex, **datos}
 
-    # 1️⃣ Obtener lat y lon
-    geo = geocode(ciudad_input)
+
+def _resultado_ciudad(ciudad_input, geo, df):
     if geo is None:
         return dbc.Alert("❌ No se encontró la ciudad. Intenta otra.", color="danger"), {}
-
-    lat = geo["lat"]
-    lon = geo["lon"]
-    name = geo["name"]
-
-    # 2️⃣ Obtener clima
-    df = obtener_clima(lat, lon)
     if df is None:
         return dbc.Alert("⚠ No se pudo obtener información del clima.", color="warning"), {}
 
-    # 3️⃣ Crear gráfica
     fig = px.line(
         df,
         x="Hora",
@@ -136,14 +141,162 @@ def actualizar_clima(n_clicks, ciudad_input):
     )
     fig.update_layout(template="simple_white")
 
-    # 4️⃣ Info de la ciudad
     info = dbc.Alert(
         [
             html.H5("📌 Ciudad encontrada:"),
-            html.P(name),
-            html.P(f"Latitud: {lat:.4f} | Longitud: {lon:.4f}"),
+            html.P(geo["name"]),
+            html.P(f"Latitud: {geo['lat']:.4f} | Longitud: {geo['lon']:.4f}"),
         ],
         color="info"
     )
 
-    return info, fig
+    return info, prepare_figure(fig)
+
+
+@dash.callback(
+    Output("info-ciudad", "children", allow_duplicate=True),
+    Output("grafico-temp", "figure", allow_duplicate=True),
+    Output("clima-pendiente", "data"),
+    Input("btn-buscar", "n_clicks"),
+    State("ciudad-input", "value"),
+    prevent_initial_call=True,
+)
+def buscar_clima(n_clicks, ciudad_input):
+    if not n_clicks or not ciudad_input:
+        return "", {}, _pendiente()
+
+    try:
+        geo = geocode(ciudad_input, cached_only=True)
+        df = None if geo is None else obtener_clima(geo["lat"], geo["lon"], cached_only=True)
+    except CacheMiss:
+        return dash.no_update, dash.no_update, _pendiente(ciudad=ciudad_input)
+    return (*_resultado_ciudad(ciudad_input, geo, df), _pendiente())
+
+
+@dash.callback(
+    Output("info-ciudad", "children"),
+    Output("grafico-temp", "figure"),
+    Input("clima-pendiente", "data"),
+    background=True,
+    running=[
+        (Output("btn-buscar", "children"), "Buscando…", "Buscar Clima"),
+        (Output("btn-cancelar", "disabled"), False, True),
+        (Output("clima-progreso", "style"), {"visibility": "visible"}, {"visibility": "hidden"}),
+    ],
+    cancel=[Input("btn-cancelar", "n_clicks")],
+    progress=[Output("clima-progreso", "value"), Output("clima-progreso", "label")],
+    progress_default=[0, ""],
+    prevent_initial_call=True,
+)
+def actualizar_clima(set_progress, pendiente):
+    if not pendiente or "ciudad" not in pendiente:
+        return dash.no_update, dash.no_update
+
+    ciudad_input = pendiente["ciudad"]
+
+    # 1️⃣ Obtener lat y lon
+    set_progress((10, "Buscando ciudad…"))
+    try:
+        geo = geocode(ciudad_input)
+    except RequestException:
+        return SERVICIO_NO_DISPONIBLE, {}
+    if geo is None:
+        return _resultado_ciudad(ciudad_input, geo, None)
+
+    # 2️⃣ Obtener clima
+    set_progress((50, "Descargando pronóstico…"))
+    try:
+        df = obtener_clima(geo["lat"], geo["lon"])
+    except RequestException:
+        return SERVICIO_NO_DISPONIBLE, {}
+
+    # 3️⃣ Crear gráfica e info de la ciudad
+    set_progress((90, "Dibujando…"))
+    return _resultado_ciudad(ciudad_input, geo, df)
+
+
+# ============================================================
+#  3. CALLBACK DE COMPARACIÓN
+# ============================================================
+def _parse_ciudades(ciudades_input):
+    return [c.strip() for c in re.split(r"[;\n]", ciudades_input or "") if c.strip()]
+
+
+def _resultado_comparacion(resultados):
+    # Superponer las series en una sola gráfica
+    fig = go.Figure()
+    sin_datos = []
+    for ciudad, geo, df in resultados:
+        if df is None:
+            sin_datos.append(ciudad)
+            continue
+        fig.add_trace(go.Scatter(
+            x=df["Hora"], y=df["Temperatura (°C)"],
+            mode="lines", name=ciudad.capitalize()
+        ))
+
+    fig.update_layout(
+        title="Temperatura por Hora — Comparación",
+        xaxis_title="Hora",
+        yaxis_title="Temperatura (°C)",
+        template="simple_white"
+    )
+
+    info = ""
+    if sin_datos:
+        info = dbc.Alert(f"⚠ Sin datos para: {', '.join(sin_datos)}", color="warning")
+
+    return info, prepare_figure(fig)
+
+
+@dash.callback(
+    Output("info-comparacion", "children", allow_duplicate=True),
+    Output("grafico-comparacion", "figure", allow_duplicate=True),
+    Output("comparacion-pendiente", "data"),
+    Input("btn-comparar", "n_clicks"),
+    State("ciudades-input", "value"),
+    prevent_initial_call=True,
+)
+def comparar_en_cache(n_clicks, ciudades_input):
+    ciudades = _parse_ciudades(ciudades_input)
+    if not n_clicks or not ciudades:
+        return "", {}, _pendiente()
+
+    try:
+        resultados = comparar_ciudades(ciudades, cached_only=True)
+    except CacheMiss:
+        return dash.no_update, dash.no_update, _pendiente(ciudades=ciudades)
+    return (*_resultado_comparacion(resultados), _pendiente())
+
+
+@dash.callback(
+    Output("info-comparacion", "children"),
+    Output("grafico-comparacion", "figure"),
+    Input("comparacion-pendiente", "data"),
+    background=True,
+    running=[
+        (Output("btn-comparar", "children"), "Comparando…", "Comparar"),
+        (Output("btn-cancelar-comparacion", "disabled"), False, True),
+        (Output("comparacion-progreso", "style"), {"visibility": "visible"}, {"visibility": "hidden"}),
+    ],
+    cancel=[Input("btn-cancelar-comparacion", "n_clicks")],
+    progress=[Output("comparacion-progreso", "value"), Output("comparacion-progreso", "label")],
+    progress_default=[0, ""],
+    prevent_initial_call=True,
+)
+def comparar_clima(set_progress, pendiente):
+    if not pendiente or "ciudades" not in pendiente:
+        return dash.no_update, dash.no_update
+
+    # 1️⃣ Ubicar todas las ciudades en paralelo y pedir los pronósticos juntos
+    def on_progress(hechas, total):
+        set_progress((int(80 * hechas / total), f"Ciudades ubicadas: {hechas}/{total}"))
+
+    try:
+        resultados = comparar_ciudades(pendiente["ciudades"], on_progress)
+    except RequestException:
+        return SERVICIO_NO_DISPONIBLE, {}
+
+    # 2️⃣ Dibujar
+    set_progress((90, "Dibujando…"))
+    return _resultado_comparacion(resultados)
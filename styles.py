@@ -36,4 +36,9 @@ INFO_CARD_STYLE = {
     'backgroundColor': '#FFD166', 
     'height': '100%',
     'color': '#2E2E2E'
-}
\ No newline at end of file
+}
+EQUATION_STYLE = {
+    'margin': '10px auto',
+    'fontSize': '1.1rem',
+    'overflowX': 'auto'
+}
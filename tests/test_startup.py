@@ -0,0 +1,30 @@
+"""Regresión del arranque en frío (ver bench/startup.py).
+
+    python -m pytest tests/test_startup.py
+
+MODELOS_STARTUP_BUDGET ajusta el presupuesto en segundos para máquinas lentas.
+"""
+import os
+
+import pytest
+
+from bench.startup import STARTUP_ALLOWED, cold_start
+
+pytest.importorskip('dash')
+
+STARTUP_BUDGET = float(os.environ.get('MODELOS_STARTUP_BUDGET', 5))
+
+
+@pytest.fixture(scope='module')
+def startup(tmp_path_factory):
+    result, _ = cold_start(str(tmp_path_factory.mktemp('startup')))
+    return result
+
+
+def test_cold_start_within_budget(startup):
+    assert startup['elapsed'] <= STARTUP_BUDGET
+
+
+def test_deferred_modules_not_imported(startup):
+    loaded = [name for name in startup['loaded'] if name not in STARTUP_ALLOWED]
+    assert loaded == [], f"se importaron al arrancar: {loaded}"
@@ -0,0 +1,50 @@
+"""Descarga la fuente Outfit a assets/fonts para servirla desde la app.
+
+Se corre una vez (y al actualizar la fuente) en una máquina con internet;
+después la app no depende de Google Fonts. Pide la hoja de estilos con un
+User-Agent que recibe woff2 y guarda el subconjunto latino de la fuente
+variable (pesos 100–900) en assets/fonts/FONT_FILE (config.py). Hasta que
+el archivo exista, app.py sigue usando la hoja de Google Fonts; después hay
+que reiniciar la app. Si cambia el archivo hay que subir la versión en
+FONT_FILE: los assets de fuentes se sirven como inmutables.
+
+    python -m tools.fetch_fonts
+"""
+import os
+import re
+import sys
+
+import requests
+
+from config import FONT_CSS_URL, FONT_FILE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FONTS_DIR = os.path.join(ROOT, 'assets', 'fonts')
+# Con un navegador moderno Google responde con woff2 y un bloque por subconjunto
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+
+def latin_url(css):
+    """URL del woff2 del bloque ``/* latin */`` de la hoja de Google Fonts."""
+    match = re.search(r"/\* latin \*/\s*@font-face\s*{[^}]*?url\((https://[^)]+\.woff2)\)", css)
+    if match is None:
+        raise ValueError("La hoja de estilos no trae el subconjunto latino en woff2")
+    return match.group(1)
+
+
+def main():
+    css = requests.get(FONT_CSS_URL, headers={'User-Agent': USER_AGENT}, timeout=10)
+    css.raise_for_status()
+    font = requests.get(latin_url(css.text), timeout=30)
+    font.raise_for_status()
+
+    os.makedirs(FONTS_DIR, exist_ok=True)
+    path = os.path.join(FONTS_DIR, FONT_FILE)
+    with open(path, 'wb') as f:
+        f.write(font.content)
+    print(f"{path}: {len(font.content):,d} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Calentamiento de la app antes de recibir tráfico (ver wsgi.py).
+
+Se pide el índice con el cliente de pruebas de Flask (Dash arma sus rutas y
+su índice en la primera petición) y se llama al ``warm_up(values)`` de cada
+página que lo define, con los valores iniciales de su layout: cada página
+llama a sus funciones ``@cached_model`` igual que sus callbacks al abrirla.
+Quedan importados scipy y las demás dependencias diferidas, compilados los
+kernels de Numba y llenas las cachés de los modelos para los parámetros por
+defecto. ``/_ready`` (app.py) responde 503 hasta que termina.
+"""
+import logging
+import sys
+import threading
+import time
+
+import dash
+from dash.development.base_component import Component
+
+log = logging.getLogger(__name__)
+
+_status = {'ready': False, 'elapsed': None, 'pages': 0, 'errors': []}
+_lock = threading.Lock()
+
+
+def status():
+    with _lock:
+        return dict(_status, errors=list(_status['errors']))
+
+
+def _initial_values(component, values):
+    """Valores iniciales ``{id: value}`` de los controles de un layout."""
+    if isinstance(component, (list, tuple)):
+        for child in component:
+            _initial_values(child, values)
+        return
+    if not isinstance(component, Component):
+        return
+    props = component.to_plotly_json()['props']
+    if isinstance(props.get('id'), str) and 'value' in props:
+        values[props['id']] = props['value']
+    for value in props.values():
+        if isinstance(value, (Component, list, tuple)):
+            _initial_values(value, values)
+
+
+def warm_up(app):
+    """Calienta todas las páginas que definen ``warm_up``; devuelve ``status()``."""
+    start = time.perf_counter()
+    app.server.test_client().get(app.config.routes_pathname_prefix)
+
+    errors, warmed = [], 0
+    for page in dash.page_registry.values():
+        hook = getattr(sys.modules[page['module']], 'warm_up', None)
+        if hook is None:
+            continue
+        values = {}
+        _initial_values(page['layout']() if callable(page['layout']) else page['layout'], values)
+        try:
+            hook(values)
+        except Exception as exc:
+            errors.append(f"{page['name']}: {exc!r}")
+        warmed += 1
+
+    elapsed = time.perf_counter() - start
+    for error in errors:
+        log.warning("Calentamiento: %s", error)
+    log.info("Calentamiento: %d páginas en %.1f s", warmed, elapsed)
+    with _lock:
+        _status.update(ready=True, elapsed=elapsed, pages=warmed, errors=errors)
+    return status()
+
+
+def skip():
+    """Marca la app como lista sin calentar (MODELOS_WARMUP=0)."""
+    with _lock:
+        _status.update(ready=True, elapsed=0.0)
@@ -0,0 +1,249 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import http_client
+from cache import PersistentCache
+from config import (
+    FORECAST_BATCH_SIZE, FORECAST_CACHE_PATH, FORECAST_GRID, FORECAST_MAX_STALE,
+    FORECAST_UPDATE_INTERVAL, GEOCODE_CACHE_PATH, GEOCODE_NEGATIVE_TTL, GEOCODE_TTL,
+    NOMINATIM_MIN_INTERVAL, NOMINATIM_URL, OPEN_METEO_URL, WEATHER_MAX_CITIES, WEATHER_MAX_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    "User-Agent": "Dash Weather App (contact: ejemplo@example.com)"
+}
+
+_MISSING = object()
+
+# Las coordenadas de una ciudad no cambian: se guardan en disco y se cargan
+# en memoria al arrancar. Las ciudades inexistentes también se recuerdan
+# (con un TTL más corto) para no volver a preguntar a Nominatim.
+geocode_cache = PersistentCache(GEOCODE_CACHE_PATH, 'geocode')
+geocode_cache.warm()
+
+# Los pronósticos se guardan por celda de la malla (ver snap_coordinates)
+forecast_cache = PersistentCache(FORECAST_CACHE_PATH, 'forecast')
+forecast_cache.warm()
+
+# Turnos de Nominatim compartidos por todos los procesos (junto a su caché)
+nominatim_limiter = http_client.RateLimiter(GEOCODE_CACHE_PATH, 'nominatim', NOMINATIM_MIN_INTERVAL)
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+class CacheMiss(LookupError):
+    """La consulta necesita salir a un servicio externo (``cached_only=True``)."""
+
+
+def normalize_query(ciudad):
+    return " ".join(ciudad.split()).casefold()
+
+
+# ============================================================
+#  1. FUNCIÓN PARA OBTENER LAT/LON DE UNA CIUDAD (GEOCODING)
+# ============================================================
+def geocode(ciudad, cached_only=False):
+    key = normalize_query(ciudad)
+    cached = geocode_cache.get(key, _MISSING)
+    if cached is not _MISSING:
+        return cached
+    if cached_only:
+        raise CacheMiss(key)
+
+    nominatim_limiter.wait()
+    r = http_client.get(NOMINATIM_URL, params={"format": "json", "q": key}, headers=HEADERS)
+
+    # Intentar convertir a JSON (un error aquí puede ser temporal: no se cachea)
+    try:
+        data = r.json()
+    except Exception:
+        return None
+
+    # Si la ciudad no existe o está mal escrita
+    if not data:
+        geocode_cache.set(key, None, ttl=GEOCODE_NEGATIVE_TTL)
+        return None
+
+    result = {
+        "lat": float(data[0]["lat"]),
+        "lon": float(data[0]["lon"]),
+        "name": data[0]["display_name"],
+    }
+    geocode_cache.set(key, result, ttl=GEOCODE_TTL)
+    return result
+
+
+# ============================================================
+#  2. FUNCIÓN PARA OBTENER CLIMA
+# ============================================================
+def snap_coordinates(lat, lon, grid=FORECAST_GRID):
+    # Puntos cercanos comparten la misma celda (y la misma entrada de caché)
+    return round(round(lat / grid) * grid, 6), round(round(lon / grid) * grid, 6)
+
+
+def _forecast_ttl():
+    # Vence justo cuando Open-Meteo publica la siguiente corrida
+    return FORECAST_UPDATE_INTERVAL - time.time() % FORECAST_UPDATE_INTERVAL
+
+
+def _forecast_key(lat, lon):
+    return f"{lat:g},{lon:g}"
+
+
+def _fetch_forecasts(points):
+    """Descarga varias ubicaciones en una sola petición a Open-Meteo.
+
+    La API acepta listas separadas por comas en latitude/longitude y responde
+    con una lista de ubicaciones en el mismo orden.
+    """
+    results = []
+    for start in range(0, len(points), FORECAST_BATCH_SIZE):
+        batch = points[start:start + FORECAST_BATCH_SIZE]
+        r = http_client.get(
+            OPEN_METEO_URL,
+            params={
+                "latitude": ",".join(f"{lat:g}" for lat, _ in batch),
+                "longitude": ",".join(f"{lon:g}" for _, lon in batch),
+                "hourly": "temperature_2m",
+            },
+        )
+        data = r.json()
+        locations = data if isinstance(data, list) else [data] * len(batch)
+
+        ttl = _forecast_ttl()
+        for (lat, lon), location in zip(batch, locations):
+            if "hourly" not in location:
+                results.append(None)
+                continue
+            hourly = {
+                "time": location["hourly"]["time"],
+                "temperature_2m": location["hourly"]["temperature_2m"],
+                "fetched": time.time(),
+            }
+            forecast_cache.set(_forecast_key(lat, lon), hourly, ttl=ttl)
+            results.append(hourly)
+    return results
+
+
+def _refresh_in_background(points):
+    with _refreshing_lock:
+        points = [p for p in points if p not in _refreshing]
+        _refreshing.update(points)
+    if not points:
+        return
+
+    def refresh():
+        try:
+            _fetch_forecasts(points)
+        except Exception:
+            logger.exception("No se pudo refrescar el pronóstico de %s", points)
+        finally:
+            with _refreshing_lock:
+                _refreshing.difference_update(points)
+
+    # No es daemon: si la consulta corre en un proceso de background callback,
+    # el proceso espera a que termine el refresco (acotado por los timeouts)
+    threading.Thread(target=refresh).start()
+
+
+def get_forecasts(coordinates, cached_only=False):
+    """Series horarias crudas ({"time", "temperature_2m", "fetched"}) o None, en orden.
+
+    Lo que está en caché se devuelve de inmediato (refrescando en segundo plano
+    lo vencido); todo lo que falta se pide en una sola llamada, o se levanta
+    ``CacheMiss`` con ``cached_only=True``.
+    """
+    points = [snap_coordinates(lat, lon) for lat, lon in coordinates]
+    results = [None] * len(points)
+    missing, stale_points = [], []
+
+    for i, point in enumerate(points):
+        hourly, stale = forecast_cache.get(_forecast_key(*point), allow_stale=True)
+        if hourly is not None and time.time() - hourly["fetched"] <= FORECAST_MAX_STALE:
+            results[i] = hourly
+            # stale-while-revalidate: se responde ya y se refresca aparte
+            if stale:
+                stale_points.append(point)
+        else:
+            missing.append(i)
+
+    if stale_points:
+        _refresh_in_background(list(dict.fromkeys(stale_points)))
+
+    if missing and cached_only:
+        raise CacheMiss(len(missing))
+    if missing:
+        unique = list(dict.fromkeys(points[i] for i in missing))
+        fetched = dict(zip(unique, _fetch_forecasts(unique)))
+        for i in missing:
+            results[i] = fetched[points[i]]
+
+    return results
+
+
+def get_forecast(lat, lon, cached_only=False):
+    return get_forecasts([(lat, lon)], cached_only)[0]
+
+
+def _to_dataframe(hourly):
+    return pd.DataFrame({
+        "Hora": pd.to_datetime(hourly["time"]),
+        "Temperatura (°C)": hourly["temperature_2m"],
+    })
+
+
+def obtener_clima(lat, lon, cached_only=False):
+    hourly = get_forecast(lat, lon, cached_only)
+    if hourly is None:
+        return None
+
+    return _to_dataframe(hourly)
+
+
+# ============================================================
+#  3. COMPARACIÓN DE VARIAS CIUDADES
+# ============================================================
+def _geocode_all(ciudades, on_progress):
+    geos = [None] * len(ciudades)
+    # Pool acotado: la mayoría de las consultas salen de la caché; las que van
+    # a Nominatim esperan su turno en nominatim_limiter
+    with ThreadPoolExecutor(max_workers=max(1, min(WEATHER_MAX_WORKERS, len(ciudades)))) as pool:
+        futures = {pool.submit(geocode, ciudad): i for i, ciudad in enumerate(ciudades)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            geos[futures[future]] = future.result()
+            if on_progress is not None:
+                on_progress(done, len(ciudades))
+    return geos
+
+
+def comparar_ciudades(ciudades, on_progress=None, cached_only=False):
+    """Geocodifica en paralelo y descarga todos los pronósticos juntos.
+
+    Devuelve una lista de (ciudad, geo, df) en el orden recibido; ``geo`` o
+    ``df`` son None si la ciudad no se encontró o no hay pronóstico.
+    ``on_progress(hechas, total)`` se llama a medida que termina cada ciudad.
+    Con ``cached_only=True`` no sale a la red: cualquier falta es ``CacheMiss``.
+    """
+    ciudades = ciudades[:WEATHER_MAX_CITIES]
+    if cached_only:
+        geos = [geocode(ciudad, cached_only=True) for ciudad in ciudades]
+    else:
+        geos = _geocode_all(ciudades, on_progress)
+
+    found = [i for i, geo in enumerate(geos) if geo is not None]
+    forecasts = get_forecasts([(geos[i]["lat"], geos[i]["lon"]) for i in found], cached_only)
+
+    dfs = [None] * len(ciudades)
+    for i, hourly in zip(found, forecasts):
+        if hourly is not None:
+            dfs[i] = _to_dataframe(hourly)
+
+    return list(zip(ciudades, geos, dfs))
+
@@ -0,0 +1,62 @@
+"""Punto de entrada de producción.
+
+    python wsgi.py                          # gunicorn con la configuración de config.py
+    gunicorn wsgi:application --preload -w 4 --threads 4 -k gthread
+
+Importar este módulo carga la app y la calienta (warmup.py): con preload eso
+ocurre una sola vez en el proceso maestro, antes de abrir el puerto, y los
+workers nacen por fork compartiendo por copy-on-write los módulos
+importados, los kernels compilados y las cachés de los modelos ya llenas.
+``/_ready`` responde 200 cuando el calentamiento terminó.
+
+Variables: MODELOS_BIND, MODELOS_WORKERS, MODELOS_THREADS, MODELOS_TIMEOUT,
+MODELOS_WARMUP (ver config.py).
+
+Dependencias de producción, además de las de la app:
+
+    pip install gunicorn flask-compress brotli
+
+flask-compress comprime las respuestas (MODELOS_COMPRESS) y brotli habilita
+``br``. Sin flask-compress app.py lo avisa en el log y se sirve sin comprimir.
+"""
+import logging
+
+import warmup
+from app import app, server
+from config import WARMUP, WEB_BIND, WEB_THREADS, WEB_TIMEOUT, WEB_WORKERS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+if WARMUP:
+    warmup.warm_up(app)
+else:
+    warmup.skip()
+
+application = server
+
+GUNICORN_OPTIONS = {
+    'bind': WEB_BIND,
+    'workers': WEB_WORKERS,
+    'threads': WEB_THREADS,
+    'worker_class': 'gthread',
+    'timeout': WEB_TIMEOUT,
+    'preload_app': True,
+}
+
+
+def main():
+    from gunicorn.app.base import BaseApplication
+
+    class Launcher(BaseApplication):
+        def load_config(self):
+            for key, value in GUNICORN_OPTIONS.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return application
+
+    Launcher().run()
+
+
+if __name__ == '__main__':
+    main()